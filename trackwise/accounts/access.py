@@ -0,0 +1,84 @@
+"""
+Access-status snapshots for TenantMiddleware.
+
+Whether a user may use the site depends on their role, UserProfile.is_active
+and StaffProfile.status. Sessions signed in through TenantModelBackend already
+have the profile and staff record joined into request.user, so their status is
+read from those rows at no extra cost. Only for users loaded without them
+(sessions of plain ModelBackend) is the snapshot cached per user; the signals in
+accounts.signals drop it whenever the user's UserProfile or StaffProfile is
+saved or deleted, so a deactivated staff member is locked out on their next
+request either way.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+ACCESS_STATUS_KEY = 'access-status:{}'
+
+def _ttl():
+    return getattr(settings, 'ACCESS_STATUS_TTL', 600)
+
+def access_status(profile):
+    """The fields of a UserProfile (and its StaffProfile) that decide access."""
+    try:
+        staff_status = profile.staffprofile.status
+    except ObjectDoesNotExist:
+        staff_status = None
+    return {'role': profile.role, 'is_active': profile.is_active, 'staff_status': staff_status}
+
+def allows_access(status):
+    """
+    Whether an access_status() snapshot lets the user in; UserProfile.should_allow_access uses it too.
+
+    Business owners always get in. Staff need an active profile and, if they have
+    a StaffProfile, a status other than inactive or on_leave.
+    """
+    if status['role'] == 'business_owner':
+        return True
+    if not status['is_active']:
+        return False
+    return status['staff_status'] not in ('inactive', 'on_leave')
+
+def _joined_profile(user):
+    """The user's UserProfile if it was loaded with its StaffProfile lookup (TenantModelBackend), else None."""
+    # __class__ rather than type(): request.user is a lazy proxy of the user
+    if not user.__class__.userprofile.is_cached(user):
+        return None
+    profile = user.userprofile
+    if not profile.__class__.staffprofile.is_cached(profile):
+        return None
+    return profile
+
+def get_access_status(user):
+    """
+    The access-status snapshot of a signed-in user.
+
+    Read from the rows TenantModelBackend joined in when present; otherwise from
+    the cache, which costs a query of its own with the database cache backend.
+
+    Raises:
+        UserProfile.DoesNotExist: if the user has no profile
+    """
+    profile = _joined_profile(user)
+    if profile is not None:
+        return access_status(profile)
+
+    key = ACCESS_STATUS_KEY.format(user.pk)
+    status = cache.get(key)
+    if status is None:
+        status = access_status(user.userprofile)
+        cache.set(key, status, timeout=_ttl())
+    return status
+
+def invalidate_access_status(user_id):
+    """
+    Forget a user's snapshot now and again once the current transaction commits.
+
+    The second delete stops a request that read the old rows before the commit
+    from caching the old status again.
+    """
+    key = ACCESS_STATUS_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
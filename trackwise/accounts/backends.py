@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from staff_management.models import StaffProfile
+from .managers import heavy_field_paths
+from .models import UserProfile
+
+UserModel = get_user_model()
+
+class TenantModelBackend(ModelBackend):
+    """ModelBackend whose per-request user lookup also loads the profile, company and staff record."""
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related(
+                'userprofile', 'userprofile__company', 'userprofile__staffprofile'
+            ).defer(
+                # select_related ignores the related default managers, so leave their large columns out here
+                *heavy_field_paths(UserProfile, 'userprofile'),
+                *heavy_field_paths(StaffProfile, 'userprofile__staffprofile'),
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,80 @@
+"""
+Per-company data version for conditional GETs.
+
+Every write to data shown on the inventory, dashboard and issue pages moves a
+company's version to a new value held under a single cache key. The ETag of
+those pages is built from the version, so an unchanged page is answered with
+304 Not Modified before the view runs a query or renders a template.
+
+ORM saves and deletes are caught by the signals in accounts.signals; bulk
+writers (queryset update(), bulk_create) call bump_data_version themselves.
+"""
+import hashlib
+import time
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from .models import UserProfile
+
+DATA_VERSION_KEY = 'company-data-version:{}'
+
+def _new_version():
+    # Time-based rather than a counter, so a version lost from the cache is never handed out again
+    return time.time_ns()
+
+def get_data_version(company_id):
+    """The current data version of a company; one cache read once it has been set."""
+    key = DATA_VERSION_KEY.format(company_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        # add() keeps the first value if several requests get here at once
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+def bump_data_version(company_id):
+    """
+    Give a company a new data version once the current transaction commits.
+
+    Bumping only after commit stops a concurrent request from tagging the old
+    data with the new version.
+    """
+    key = DATA_VERSION_KEY.format(company_id)
+    transaction.on_commit(lambda: cache.set(key, _new_version(), timeout=None))
+
+def company_data_etag(request, *args, **kwargs):
+    """
+    ETag for pages that show only company data, for use with condition().
+
+    Combines the company data version with everything else the page depends
+    on: the user, their CSRF secret (which changes on login), the query string
+    and the company-local date (for "today" counters). Returns None, which disables the
+    304 check, when flash messages are waiting to be shown.
+    """
+    try:
+        profile = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        return None
+    if len(get_messages(request)):
+        return None
+    parts = [
+        profile.company_id,
+        get_data_version(profile.company_id),
+        request.user.pk,
+        request.META.get('CSRF_COOKIE', ''),
+        request.get_full_path(),
+        profile.company.local_date().isoformat(),
+    ]
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+def company_data_condition(view_func):
+    """
+    Answer repeat GETs of a company page with 304 while company_data_etag is unchanged.
+
+    Responses are marked private and no-cache, so browsers revalidate every
+    time and shared caches never store them.
+    """
+    return cache_control(private=True, no_cache=True)(condition(etag_func=company_data_etag)(view_func))
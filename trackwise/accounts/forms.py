@@ -3,6 +3,7 @@ from django.contrib.auth.forms import PasswordChangeForm, UserCreationForm, Auth
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from .models import UserProfile, Company
+from zoneinfo import available_timezones
 
 class BusinessOwnerRegistrationForm(UserCreationForm):
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={
@@ -345,14 +346,18 @@ class BusinessOwnerProfileForm(forms.ModelForm):
         
         return profile
 
+TIME_ZONE_CHOICES = [(name, name) for name in sorted(available_timezones())]
+
 class CompanyForm(forms.ModelForm):
     class Meta:
         model = Company
-        fields = ['name', 'address', 'contact_info']
+        fields = ['name', 'address', 'contact_info', 'low_stock_threshold', 'time_zone']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'address': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
             'contact_info': forms.TextInput(attrs={'class': 'form-control'}),
+            'low_stock_threshold': forms.NumberInput(attrs={'class': 'form-control', 'min': 0}),
+            'time_zone': forms.Select(attrs={'class': 'form-control'}, choices=TIME_ZONE_CHOICES),
         }
 
 class CustomPasswordChangeForm(PasswordChangeForm):
@@ -0,0 +1,183 @@
+"""
+Resized WebP/JPEG variants of uploaded images.
+
+Uploads are stored untouched in ImageBlob; this module derives the smaller
+copies that pages actually render. Generation runs on a small thread pool so
+the upload request returns without waiting on Pillow. Jobs live only in this
+process and are skipped when the pool is busy, so image_response asks again
+(ensure_variants) the first time it serves a blob that has none, and the
+generate_image_variants command backfills whatever is still missing.
+"""
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest edge of each generated variant; the largest doubles as the capped "full size" image
+VARIANT_SIZES = (64, 256, 1600)
+
+# Variant format -> (Pillow format name, MIME type)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+VARIANT_QUALITY = 82
+
+# Cache key marking a blob whose variants a request has already asked for
+VARIANT_REQUEST_KEY = 'image-variants-requested:{}'
+# How long before another request may ask again, e.g. for bytes Pillow cannot read
+VARIANT_REQUEST_TIMEOUT = 600
+
+_executor = None
+_pending = None
+_lock = threading.Lock()
+# Blob ids waiting on or running in the pool
+_queued = set()
+
+def _get_executor():
+    """Create the shared worker pool and its pending-job limit on first use."""
+    global _executor, _pending
+    with _lock:
+        if _executor is None:
+            workers = getattr(settings, 'IMAGE_VARIANT_WORKERS', 2)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-variants')
+            _pending = threading.BoundedSemaphore(getattr(settings, 'IMAGE_VARIANT_QUEUE_SIZE', workers * 8))
+    return _executor, _pending
+
+def schedule_variants(blob_id):
+    """
+    Generate variants for a stored upload once the surrounding transaction commits.
+
+    With IMAGE_VARIANTS_ASYNC disabled the work runs inline, which keeps tests deterministic.
+    """
+    if not getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+        generate_variants(blob_id)
+        return
+    transaction.on_commit(lambda: _submit(blob_id))
+
+def ensure_variants(blob_id):
+    """Ask for the variants of a blob that is being served without any, at most once per VARIANT_REQUEST_TIMEOUT."""
+    if cache.add(VARIANT_REQUEST_KEY.format(blob_id), 1, timeout=VARIANT_REQUEST_TIMEOUT):
+        schedule_variants(blob_id)
+
+def _submit(blob_id):
+    executor, pending = _get_executor()
+    with _lock:
+        if blob_id in _queued:
+            return
+        if not pending.acquire(blocking=False):
+            # Queue is full: skip rather than hold up the request; ensure_variants or the backfill command retries
+            logger.warning(f"Image variant queue full, skipped variants for blob {blob_id}")
+            return
+        _queued.add(blob_id)
+    executor.submit(_run, blob_id, pending)
+
+def _run(blob_id, pending):
+    try:
+        generate_variants(blob_id)
+    except Exception as e:
+        logger.error(f"Image variant generation failed for blob {blob_id}: {str(e)}")
+    finally:
+        with _lock:
+            _queued.discard(blob_id)
+        pending.release()
+        # Worker threads hold their own DB connection
+        connection.close()
+
+def _encode(img, variant_format):
+    """Encode a Pillow image as the given variant format and return the bytes."""
+    if img.mode not in ('RGB', 'RGBA'):
+        has_alpha = img.mode in ('LA', 'PA', 'P') and ('transparency' in img.info or img.mode != 'P')
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+
+    pil_format, _ = VARIANT_FORMATS[variant_format]
+    options = {'quality': VARIANT_QUALITY}
+    if variant_format == 'jpeg':
+        if img.mode == 'RGBA':
+            # JPEG has no alpha channel, flatten onto white
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=4)
+
+    buffer = io.BytesIO()
+    img.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+def generate_variants(blob_id):
+    """
+    Create any missing variants of an ImageBlob.
+
+    Returns:
+        int: Number of variants created (0 if all existed or the bytes are not a readable image)
+    """
+    from .models import ImageBlob, ImageVariant
+
+    existing = set(ImageVariant.objects.filter(source_id=blob_id).values_list('max_size', 'format'))
+    wanted = [(size, fmt) for size in VARIANT_SIZES for fmt in VARIANT_FORMATS if (size, fmt) not in existing]
+    if not wanted:
+        return 0
+
+    data = ImageBlob.objects.filter(pk=blob_id).values_list('data', flat=True).first()
+    if data is None:
+        return 0
+
+    try:
+        img = Image.open(io.BytesIO(bytes(data)))
+        # Let the JPEG decoder downscale while decoding large photos
+        img.draft('RGB', (max(VARIANT_SIZES), max(VARIANT_SIZES)))
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning(f"Skipping variants for blob {blob_id}, not a readable image: {str(e)}")
+        return 0
+
+    created = 0
+    # Work from the largest size down so each resize starts from the previous, smaller copy
+    current = img
+    for size in sorted({size for size, _ in wanted}, reverse=True):
+        current = current.copy()
+        current.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for size_wanted, fmt in wanted:
+            if size_wanted != size:
+                continue
+            blob = ImageBlob.store(_encode(current, fmt), VARIANT_FORMATS[fmt][1])
+            _, was_created = ImageVariant.objects.get_or_create(
+                source_id=blob_id,
+                max_size=size,
+                format=fmt,
+                defaults={'blob': blob, 'width': current.width, 'height': current.height},
+            )
+            created += int(was_created)
+    return created
+
+def pick_variant(blob_id, width=None, accept=''):
+    """
+    Choose the smallest variant of a blob that covers `width` pixels.
+
+    Args:
+        blob_id: Source ImageBlob primary key
+        width: Requested display width, or None for the capped full-size image
+        accept: The request's Accept header, used to prefer WebP
+
+    Returns:
+        int or None: ImageBlob id of the variant, or None if no variants exist yet
+    """
+    from .models import ImageVariant
+
+    fmt = 'webp' if 'image/webp' in accept else 'jpeg'
+    variants = ImageVariant.objects.filter(source_id=blob_id, format=fmt)
+    if width:
+        variant_id = variants.filter(max_size__gte=width).order_by('max_size').values_list('blob_id', flat=True).first()
+        if variant_id:
+            return variant_id
+    return variants.order_by('-max_size').values_list('blob_id', flat=True).first()
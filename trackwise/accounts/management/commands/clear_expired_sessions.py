@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from accounts.session_store import SessionStore
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions from the database in batches (run daily, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help=f'Sessions deleted per statement (default: SESSION_CLEANUP_BATCH_SIZE, '
+                                 f'currently {getattr(settings, "SESSION_CLEANUP_BATCH_SIZE", 5000)})')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        deleted = SessionStore.clear_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions"))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+from accounts.images import VARIANT_FORMATS, VARIANT_SIZES, generate_variants
+from accounts.models import ImageBlob, UserProfile
+from inventory.models import Product
+
+class Command(BaseCommand):
+    help = 'Generate missing resized variants of product and profile images (e.g. after jobs were lost in a restart)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Images looked up per query (default: 100)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        wanted = len(VARIANT_SIZES) * len(VARIANT_FORMATS)
+        sources = ImageBlob.objects.filter(
+            Q(pk__in=Product.objects.values('image_blob')) | Q(pk__in=UserProfile.objects.values('profile_picture_blob'))
+        ).annotate(variant_count=Count('variants')).filter(variant_count__lt=wanted)
+
+        last_pk = 0
+        completed = skipped = created = 0
+        while True:
+            blob_ids = list(sources.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['batch_size']])
+            if not blob_ids:
+                break
+            for blob_id in blob_ids:
+                count = generate_variants(blob_id)
+                if count:
+                    completed += 1
+                    created += count
+                else:
+                    # Not a readable image (logged by generate_variants), or finished meanwhile
+                    skipped += 1
+            last_pk = blob_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} variants for {completed} images, skipped {skipped}"
+        ))
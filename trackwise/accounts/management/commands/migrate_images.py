@@ -0,0 +1,123 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from accounts.images import generate_variants
+from accounts.models import ImageBlob, MigrationCheckpoint, UserProfile
+from accounts.utils import decode_base64_image
+from inventory.models import Product
+
+# target name -> (model, legacy base64 field, content type field, blob FK field)
+TARGETS = {
+    'product': (Product, 'image', 'image_content_type', 'image_blob'),
+    'profile': (UserProfile, 'profile_picture', 'profile_picture_content_type', 'profile_picture_blob'),
+}
+
+class Command(BaseCommand):
+    help = 'Move legacy base64 images into ImageBlob in small, resumable batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=['all', *TARGETS], default='all',
+                            help='Which table to migrate (default: all)')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Rows read and updated per transaction (default: 200)')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to limit load on a live database')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Decode and report without writing anything')
+        parser.add_argument('--with-variants', action='store_true',
+                            help='Also generate resized variants inline for each migrated image')
+        parser.add_argument('--reset', action='store_true',
+                            help='Ignore the saved checkpoint and start from the first row')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        targets = TARGETS if options['target'] == 'all' else {options['target']: TARGETS[options['target']]}
+        for name, target in targets.items():
+            self.migrate_target(name, *target, options)
+
+    def migrate_target(self, name, model, image_field, type_field, blob_field, options):
+        dry_run = options['dry_run']
+        checkpoint_name = f'migrate_images:{name}'
+        if dry_run:
+            checkpoint = MigrationCheckpoint(name=checkpoint_name)
+        else:
+            checkpoint, _ = MigrationCheckpoint.objects.get_or_create(name=checkpoint_name)
+            if options['reset']:
+                checkpoint.last_pk = checkpoint.processed = checkpoint.failed = 0
+                checkpoint.save()
+
+        self.stdout.write(f"Migrating {name} images from pk > {checkpoint.last_pk}" + (" (dry run)" if dry_run else ""))
+
+        pending = model.objects.filter(**{f'{image_field}__isnull': False}).exclude(**{image_field: ''})
+        started = time.monotonic()
+        migrated = failed = 0
+        bytes_before = bytes_after = 0
+
+        while True:
+            batch_started = time.monotonic()
+            # Keyset pagination over ids only; each row's base64 text is read on its own below,
+            # so memory holds one legacy image at a time whatever the batch size
+            pks = list(
+                pending.filter(pk__gt=checkpoint.last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not pks:
+                break
+
+            batch_migrated = batch_failed = 0
+            with transaction.atomic():
+                for pk in pks:
+                    row = pending.filter(pk=pk).values_list(image_field, type_field).first()
+                    if row is None:
+                        # Deleted or migrated since the ids were read
+                        continue
+                    text, content_type = row
+                    content, prefixed_type = decode_base64_image(text)
+                    if content is None:
+                        batch_failed += 1
+                        self.stderr.write(f"  {name} {pk}: could not decode base64 data, left untouched")
+                        continue
+
+                    content_type = content_type or prefixed_type or 'image/jpeg'
+                    bytes_before += len(text)
+                    bytes_after += len(content)
+                    batch_migrated += 1
+                    if dry_run:
+                        continue
+
+                    blob = ImageBlob.store(content, content_type)
+                    # Plain UPDATE: touches only the image columns and leaves updated_at alone
+                    model.objects.filter(pk=pk, **{f'{blob_field}__isnull': True}).update(**{
+                        blob_field: blob,
+                        image_field: None,
+                        type_field: content_type,
+                    })
+                    if options['with_variants']:
+                        generate_variants(blob.pk)
+
+                checkpoint.last_pk = pks[-1]
+                checkpoint.processed += batch_migrated
+                checkpoint.failed += batch_failed
+                if not dry_run:
+                    checkpoint.save()
+
+            migrated += batch_migrated
+            failed += batch_failed
+            elapsed = time.monotonic() - batch_started
+            self.stdout.write(
+                f"  {name}: up to pk {checkpoint.last_pk}, {batch_migrated} migrated, {batch_failed} failed "
+                f"({len(pks) / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{name}: {migrated} migrated, {failed} failed in {elapsed:.1f}s "
+            f"({migrated / elapsed if elapsed else 0:.0f} rows/s); "
+            f"{bytes_before / 1024 / 1024:.1f} MB of base64 -> {bytes_after / 1024 / 1024:.1f} MB raw"
+        ))
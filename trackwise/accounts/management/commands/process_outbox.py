@@ -0,0 +1,30 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from accounts.outbox import process_outbox
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox (run from cron, or with --loop as a worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help=f'Emails claimed and sent per connection (default: EMAIL_OUTBOX_BATCH_SIZE, '
+                                 f'currently {getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 50)})')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, polling for new emails')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds between polls with --loop when the outbox is empty (default: 5)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['interval'] <= 0:
+            raise CommandError('--interval must be positive')
+
+        while True:
+            sent, failed = process_outbox(options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails, {failed} failed attempts"))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+"""
+Default managers that keep large free-text columns out of ordinary queries.
+
+Models list such columns (notes, descriptions, JSON blobs) in HEAVY_FIELDS and
+use HeavyFieldsManager as `objects`, so list views, counts and lookups never
+fetch them. Reading a deferred column on an instance costs one extra query, so
+pages that show or edit them ask for the full row with with_heavy_fields().
+only() cannot bring a heavy column back on its own (Django drops deferred names
+from it), so call with_heavy_fields() first when a projection needs one.
+
+Related-object access (profile.staffprofile, issue.reporter) goes through the
+base manager and select_related through neither, so those paths defer with
+heavy_field_paths() where it matters, e.g. in TenantModelBackend.
+"""
+from django.db import models
+
+class HeavyFieldsQuerySet(models.QuerySet):
+    def with_heavy_fields(self):
+        """Load every column, including the model's HEAVY_FIELDS."""
+        return self.defer(None)
+
+class HeavyFieldsManager(models.Manager.from_queryset(HeavyFieldsQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().defer(*self.model.HEAVY_FIELDS)
+
+def heavy_field_paths(model, prefix):
+    """HEAVY_FIELDS of `model` as lookups from a query that reaches it through `prefix`, for defer()."""
+    return [f'{prefix}__{name}' for name in model.HEAVY_FIELDS]
@@ -2,33 +2,38 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.urls import reverse
+from .access import allows_access, get_access_status
+from .models import UserProfile
+from .tenant import Tenant
+
+class TenantMiddleware:
+    """Attach request.tenant and sign out staff whose access has been revoked."""
 
-class UserStatusMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
+        request.tenant = Tenant(request.user)
+
         # Skip for non-authenticated users
         if request.user.is_authenticated:
             try:
-                # Get user profile
-                profile = request.user.userprofile
-                
-                # Check if user should be allowed access
-                if not profile.should_allow_access():
+                # Check if user should be allowed access; uses the profile the auth backend joined in
+                if not allows_access(get_access_status(request.user)):
                     # Force logout and redirect to login page
                     logout(request)
+                    request.tenant = Tenant(request.user)
                     messages.warning(request, 'Your account has been deactivated or placed on leave. Please contact your administrator.')
                     
                     # Redirect to login page, excluding logout endpoint itself
                     if request.path != reverse('accounts:logout'):
                         return redirect('accounts:login')
-            except AttributeError:
+            except UserProfile.DoesNotExist:
                 # User has no profile, allow admin to handle
                 pass
             except Exception as e:
                 # Log error but don't break the site
-                print(f"Error in UserStatusMiddleware: {e}")
+                print(f"Error in TenantMiddleware: {e}")
 
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_delete_emailverification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('content_type', models.CharField(default='image/jpeg', max_length=50)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='profile_picture_blob',
+            field=models.ForeignKey(blank=True, help_text='Deduplicated raw bytes of the profile picture', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.imageblob'),
+        ),
+    ]
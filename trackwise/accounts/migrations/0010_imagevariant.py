@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_imageblob_userprofile_profile_picture_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_size', models.PositiveIntegerField(help_text='Longest edge the image was fitted into')),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=10)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.imageblob')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='accounts.imageblob')),
+            ],
+            options={
+                'unique_together': {('source', 'max_size', 'format')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:55
+
+from django.conf import settings
+from django.db import migrations, models
+from accounts.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0011_migrationcheckpoint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['company', 'role'], name='userprofile_company_role_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_tenant_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(default=10, help_text='Products at or below this quantity count as low stock, unless they set their own reorder point'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:08
+
+import accounts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_company_low_stock_threshold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='time_zone',
+            field=models.CharField(default='Asia/Manila', max_length=64, validators=[accounts.models.validate_time_zone]),
+        ),
+    ]
@@ -1,19 +1,172 @@
-from django.db import models
+from django.db import models, IntegrityError, transaction
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.urls import reverse
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from .access import access_status, allows_access
+from .managers import HeavyFieldsManager
 import base64
+import hashlib
+
+class ImageBlob(models.Model):
+    """
+    Raw image bytes stored once per distinct content.
+    Rows are addressed by the SHA-256 of their bytes so identical uploads share a single blob.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    data = models.BinaryField()
+    content_type = models.CharField(max_length=50, default='image/jpeg')
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.content_type}, {self.size} bytes)"
+
+    @classmethod
+    def store(cls, content, content_type=None):
+        """Return the blob holding `content`, creating it only if these bytes were never stored."""
+        digest = hashlib.sha256(content).hexdigest()
+        blob = cls.objects.filter(sha256=digest).only('id', 'sha256', 'content_type', 'size').first()
+        if blob:
+            return blob
+        try:
+            with transaction.atomic():
+                return cls.objects.create(
+                    sha256=digest,
+                    data=content,
+                    content_type=content_type or 'image/jpeg',
+                    size=len(content),
+                )
+        except IntegrityError:
+            # Another request stored the same bytes first
+            return cls.objects.only('id', 'sha256', 'content_type', 'size').get(sha256=digest)
+
+    @classmethod
+    def store_file(cls, uploaded_file):
+        """Store an uploaded file, queue its resized variants and return its blob."""
+        from .images import schedule_variants
+        blob = cls.store(uploaded_file.read(), getattr(uploaded_file, 'content_type', None))
+        schedule_variants(blob.pk)
+        return blob
+
+    def as_data_url(self):
+        """Get the blob as a base64 data URL for HTML display."""
+        encoded = base64.b64encode(bytes(self.data)).decode('utf-8')
+        return f"data:{self.content_type};base64,{encoded}"
+
+class ImageVariant(models.Model):
+    """A resized, re-encoded copy of an uploaded ImageBlob (see accounts.images)."""
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ]
+
+    source = models.ForeignKey(ImageBlob, on_delete=models.CASCADE, related_name='variants')
+    blob = models.ForeignKey(ImageBlob, on_delete=models.CASCADE, related_name='+')
+    max_size = models.PositiveIntegerField(help_text="Longest edge the image was fitted into")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('source', 'max_size', 'format')
+
+    def __str__(self):
+        return f"{self.source.sha256[:12]} @ {self.max_size}px {self.format}"
+
+class MigrationCheckpoint(models.Model):
+    """Resume point for long-running data migration commands (e.g. migrate_images)."""
+    name = models.CharField(max_length=100, unique=True)
+    last_pk = models.BigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_pk}"
+
+class EmailOutbox(models.Model):
+    """
+    An email waiting to be delivered by the process_outbox command (see accounts.outbox).
+
+    Requests only insert rows; the worker claims due rows, sends them and either
+    marks them sent or schedules the next attempt with exponential backoff.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField(blank=True)
+    text_content = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    # When the row is next due; also pushed forward while a worker holds it
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's "due pending rows, oldest first" scan
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+def validate_time_zone(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f'"{value}" is not a known time zone.')
 
 class Company(models.Model):
     name = models.CharField(max_length=200)
     address = models.TextField(blank=True)
     contact_info = models.CharField(max_length=100, blank=True)
+    low_stock_threshold = models.PositiveIntegerField(
+        default=10,
+        help_text="Products at or below this quantity count as low stock, unless they set their own reorder point"
+    )
+    # Where "today" starts and ends for the company's dashboards
+    time_zone = models.CharField(max_length=64, default='Asia/Manila', validators=[validate_time_zone])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
     
+    @property
+    def tzinfo(self):
+        return ZoneInfo(self.time_zone)
+    
+    def local_date(self, value=None):
+        """The company-local date of `value` (default: now)."""
+        return timezone.localdate(value, self.tzinfo)
+    
+    def day_range(self, day=None):
+        """
+        Bounds of a company-local day, for half-open range filters (start <= t < end).
+        
+        Args:
+            day: Local date (default: today)
+        
+        Returns:
+            tuple: (start, end) as aware datetimes
+        """
+        day = day or self.local_date()
+        start = datetime.combine(day, time.min, tzinfo=self.tzinfo)
+        end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=self.tzinfo)
+        return start, end
+    
     def staff_count(self):
         """Count staff members in this company"""
         return UserProfile.objects.filter(company=self, role='staff').count()
@@ -52,9 +205,13 @@ class UserProfile(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
     phone_number = models.CharField(max_length=20, blank=True)
     
-    # Change from ImageField to TextField for BLOB/base64 storage
+    # Legacy base64 storage, kept readable until rows are migrated to ImageBlob
     profile_picture = models.TextField(blank=True, null=True, help_text="Base64 encoded profile picture")
     profile_picture_content_type = models.CharField(max_length=50, blank=True, null=True, help_text="MIME type of the profile picture")
+    profile_picture_blob = models.ForeignKey(
+        ImageBlob, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        help_text="Deduplicated raw bytes of the profile picture"
+    )
     
     # Add the missing fields that exist in your database
     assigned_location = models.CharField(max_length=100, blank=True, default='Main Office')
@@ -67,6 +224,16 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Left out of queries by default (the legacy picture is read only by its endpoint); see accounts.managers
+    HEAVY_FIELDS = ('notes', 'profile_picture')
+    objects = HeavyFieldsManager()
+    
+    class Meta:
+        indexes = [
+            # Staff counts and lists per company
+            models.Index(fields=['company', 'role'], name='userprofile_company_role_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} - {self.role} - {self.company.name}"
     
@@ -83,6 +250,8 @@ class UserProfile(models.Model):
     @property
     def profile_picture_base64(self):
         """Get profile picture as base64 data URL for HTML display."""
+        if self.profile_picture_blob_id:
+            return self.profile_picture_blob.as_data_url()
         if self.profile_picture:
             try:
                 # Remove any existing data URL prefix if present
@@ -99,19 +268,51 @@ class UserProfile(models.Model):
                 return None
         return None
     
+    def profile_picture_url_for(self, width=None):
+        """
+        URL of the avatar endpoint; blob-backed URLs carry the blob id so they can be cached forever.
+        `width` asks for the smallest generated variant that covers that many pixels.
+        """
+        url = reverse('accounts:profile_picture', kwargs={'pk': self.pk})
+        if self.profile_picture_blob_id:
+            url = f"{url}?v={self.profile_picture_blob_id}"
+            return f"{url}&w={width}" if width else url
+        if self._has_legacy_picture():
+            return url
+        return None
+    
+    def _has_legacy_picture(self):
+        """Whether the picture still lives in the legacy base64 column, without loading that column."""
+        if 'has_legacy_picture' in self.__dict__:
+            return self.has_legacy_picture
+        if 'profile_picture' not in self.get_deferred_fields():
+            return bool(self.profile_picture)
+        # Legacy uploads always stored their content type next to the base64 text
+        return bool(self.profile_picture_content_type)
+    
+    @property
+    def profile_picture_url(self):
+        return self.profile_picture_url_for()
+    
+    @property
+    def profile_picture_thumbnail_url(self):
+        return self.profile_picture_url_for(64)
+    
+    @property
+    def profile_picture_preview_url(self):
+        return self.profile_picture_url_for(256)
+    
     def set_profile_picture_from_file(self, uploaded_file):
         """Set profile picture from uploaded file."""
         if uploaded_file:
             try:
-                # Read file content
-                file_content = uploaded_file.read()
-                
-                # Encode to base64
-                encoded = base64.b64encode(file_content).decode('utf-8')
-                
-                # Store in profile_picture field
-                self.profile_picture = encoded
-                self.profile_picture_content_type = uploaded_file.content_type
+                # Store raw bytes in the shared blob table
+                blob = ImageBlob.store_file(uploaded_file)
+
+                self.profile_picture_blob = blob
+                self.profile_picture_content_type = blob.content_type
+                # Drop the legacy base64 copy so the row stays small
+                self.profile_picture = None
                 return True
             except Exception as e:
                 print(f"Error setting profile picture: {e}")
@@ -123,22 +324,5 @@ class UserProfile(models.Model):
         Check if user should be allowed to access the system.
         Staff members are blocked if their profile is inactive or if their StaffProfile status is inactive/on_leave.
         """
-        # Always allow business owners
-        if self.role == 'business_owner':
-            return True
-            
-        # Check UserProfile's is_active field
-        if not self.is_active:
-            return False
-            
-        # Check if there's a StaffProfile with inactive or on_leave status
-        try:
-            from staff_management.models import StaffProfile
-            staff_profile = StaffProfile.objects.get(user_profile=self)
-            if staff_profile.status in ['inactive', 'on_leave']:
-                return False
-        except StaffProfile.DoesNotExist:
-            # If no StaffProfile exists, allow access based on UserProfile.is_active
-            pass
-            
-        return True
\ No newline at end of file
+        # The StaffProfile comes from the row TenantModelBackend joined in, so this is usually free
+        return allows_access(access_status(self))
\ No newline at end of file
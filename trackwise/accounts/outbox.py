@@ -0,0 +1,235 @@
+"""
+Transactional email outbox.
+
+Requests only insert EmailOutbox rows (enqueue_email, or send_infobip_email in
+accounts.utils), so a slow mail provider never holds up a web worker. The
+process_outbox command delivers them in batches:
+
+- claim_batch locks due rows with SELECT ... FOR UPDATE SKIP LOCKED, so
+  concurrent workers never pick the same email, and pushes their
+  next_attempt_at forward by CLAIM_TIMEOUT before committing. Sending happens
+  outside that transaction; rows of a worker that dies mid-batch become due
+  again once the claim lapses.
+- A batch opens at most one Infobip HTTPS connection and one connection of the
+  configured Django email backend (SMTP in production) and sends every message
+  over them. Infobip is tried first when INFOBIP_API_KEY is set, with the email
+  backend as the fallback, as before.
+- A failed email is retried after EMAIL_OUTBOX_RETRY_DELAY seconds, doubling
+  with each attempt up to EMAIL_OUTBOX_RETRY_MAX_DELAY, and is marked failed
+  after EMAIL_OUTBOX_MAX_ATTEMPTS attempts.
+"""
+import http.client
+import logging
+import uuid
+from datetime import timedelta
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed row is left alone before another worker may retry it
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+INFOBIP_SEND_PATH = '/email/3/send'
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+def enqueue_email(to_email, subject, html_content, text_content=None):
+    """
+    Queue an email for the process_outbox worker.
+
+    Returns:
+        EmailOutbox: the queued row
+    """
+    return EmailOutbox.objects.create(
+        to_email=to_email, subject=subject[:255], html_content=html_content, text_content=text_content or '',
+    )
+
+def retry_delay(attempts):
+    """Seconds to wait before retrying an email that has failed `attempts` times."""
+    delay = _setting('EMAIL_OUTBOX_RETRY_DELAY', 60) * 2 ** (attempts - 1)
+    return min(delay, _setting('EMAIL_OUTBOX_RETRY_MAX_DELAY', 3600))
+
+def claim_batch(batch_size):
+    """
+    Claim up to `batch_size` due emails for this worker, oldest first.
+
+    Returns:
+        list: EmailOutbox rows, with `attempts` already counting this attempt
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if emails:
+            EmailOutbox.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=now + CLAIM_TIMEOUT, attempts=F('attempts') + 1,
+            )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+class InfobipTransport:
+    """Sends through the Infobip email API over one keep-alive HTTPS connection."""
+    name = 'Infobip'
+
+    def __init__(self):
+        base_url = settings.INFOBIP_BASE_URL
+        if not base_url.startswith('http'):
+            base_url = f"https://{base_url}"
+        self.host = urlsplit(base_url).netloc
+        self.connection = None
+
+    def send(self, email):
+        if self.connection is None:
+            self.connection = http.client.HTTPSConnection(self.host, timeout=_setting('EMAIL_TIMEOUT', None) or 30)
+        boundary = uuid.uuid4().hex
+        body = _multipart_body(boundary, [
+            ('from', settings.INFOBIP_SENDER_EMAIL),
+            ('to', email.to_email),
+            ('subject', email.subject),
+            ('text', email.text_content or email.html_content),
+            ('html', email.html_content),
+        ])
+        try:
+            self.connection.request('POST', INFOBIP_SEND_PATH, body=body, headers={
+                'Authorization': f"App {settings.INFOBIP_API_KEY}",
+                'Content-Type': f"multipart/form-data; boundary={boundary}",
+                'Accept': 'application/json',
+            })
+            response = self.connection.getresponse()
+            # Read the whole body so the connection can carry the next request
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.status >= 300:
+            raise RuntimeError(f"HTTP {response.status}: {payload[:200].decode('utf-8', 'replace')}")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+class BackendTransport:
+    """Sends through the configured Django email backend, keeping one connection open for the batch."""
+    name = 'SMTP'
+
+    def __init__(self):
+        self.connection = None
+
+    def send(self, email):
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+            # Opened here, send_messages leaves the connection open for the next message
+            self.connection.open()
+        message = EmailMultiAlternatives(
+            subject=email.subject,
+            body=email.text_content or email.html_content,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email.to_email],
+            connection=self.connection,
+        )
+        if email.html_content:
+            message.attach_alternative(email.html_content, 'text/html')
+        try:
+            message.send()
+        except Exception:
+            # The server may have dropped us; reconnect for the next message
+            self.close()
+            raise
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception as e:
+                logger.warning(f"Closing email connection failed: {e}")
+            self.connection = None
+
+def _multipart_body(boundary, fields):
+    lines = []
+    for name, value in fields:
+        lines += [f"--{boundary}", f'Content-Disposition: form-data; name="{name}"', '', value]
+    lines += [f"--{boundary}--", '']
+    return '\r\n'.join(lines).encode('utf-8')
+
+def _transports():
+    transports = [BackendTransport()]
+    if _setting('INFOBIP_API_KEY', None):
+        transports.insert(0, InfobipTransport())
+    return transports
+
+def _deliver(email, transports):
+    """
+    Returns:
+        str: why every transport failed, or None once one of them sent the email
+    """
+    errors = []
+    for transport in transports:
+        try:
+            transport.send(email)
+            return None
+        except Exception as e:
+            logger.warning(f"{transport.name} email to {email.to_email} failed: {e}")
+            errors.append(f"{transport.name}: {e}")
+    return '; '.join(errors)
+
+def process_batch(batch_size=None):
+    """
+    Claim and send one batch of due emails.
+
+    Returns:
+        tuple: (emails sent, emails that failed this attempt)
+    """
+    emails = claim_batch(batch_size or _setting('EMAIL_OUTBOX_BATCH_SIZE', 50))
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    transports = _transports()
+    try:
+        for email in emails:
+            error = _deliver(email, transports)
+            now = timezone.now()
+            if error is None:
+                EmailOutbox.objects.filter(pk=email.pk).update(status='sent', sent_at=now, last_error='')
+                sent += 1
+                continue
+
+            failed += 1
+            if email.attempts >= _setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 8):
+                logger.error(f"Giving up on email {email.pk} to {email.to_email}: {error}")
+                EmailOutbox.objects.filter(pk=email.pk).update(status='failed', last_error=error)
+            else:
+                EmailOutbox.objects.filter(pk=email.pk).update(
+                    next_attempt_at=now + timedelta(seconds=retry_delay(email.attempts)), last_error=error,
+                )
+    finally:
+        for transport in transports:
+            transport.close()
+    return sent, failed
+
+def process_outbox(batch_size=None):
+    """
+    Send batches until no email is due.
+
+    Returns:
+        tuple: (emails sent, failed attempts)
+    """
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = process_batch(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
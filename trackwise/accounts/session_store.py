@@ -0,0 +1,62 @@
+"""
+Session engine that refreshes a session's expiry only now and then.
+
+With SESSION_SAVE_EVERY_REQUEST every page view, including each stock +/- click,
+rewrote its django_session row just to push the expiry forward. This store
+keeps cached_db's read path (cache first, database on a miss) and writes a
+session only when its data changes or when more than SESSION_REFRESH_FRACTION
+of SESSION_COOKIE_AGE has passed since it was last saved. The cookie and the
+database row are refreshed together, so a user active within the lifetime of
+their session stays signed in, while the write rate drops to about one per
+refresh interval per user.
+
+Expired rows are deleted in batches by clear_expired, which both Django's
+clearsessions and our clear_expired_sessions command call.
+"""
+import time
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+# Session key holding the unix time of the last save
+REFRESHED_AT_KEY = '_refreshed_at'
+
+def _refresh_interval(cookie_age):
+    return cookie_age * getattr(settings, 'SESSION_REFRESH_FRACTION', 0.1)
+
+class SessionStore(CachedDBStore):
+    def load(self):
+        data = super().load()
+        refreshed_at = data.get(REFRESHED_AT_KEY)
+        # Sessions with their own expiry (set_expiry) are not rolling, so leave them be
+        if data and '_session_expiry' not in data:
+            if refreshed_at is None or time.time() - refreshed_at > _refresh_interval(self.get_session_cookie_age()):
+                # SessionMiddleware saves modified sessions and re-sends the cookie with a fresh max_age
+                self.modified = True
+        return data
+
+    def save(self, must_create=False):
+        # Stamp only sessions with data, so anonymous visitors still get no session row
+        if self._session:
+            self._session[REFRESHED_AT_KEY] = int(time.time())
+        super().save(must_create=must_create)
+
+    @classmethod
+    def clear_expired(cls, batch_size=None):
+        """
+        Delete expired session rows, batch_size (default SESSION_CLEANUP_BATCH_SIZE) at a time.
+
+        Returns:
+            int: number of sessions deleted
+        """
+        if batch_size is None:
+            batch_size = getattr(settings, 'SESSION_CLEANUP_BATCH_SIZE', 5000)
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = 0
+        while True:
+            # Short transactions so sign-ins are not blocked behind one huge DELETE
+            keys = list(model.objects.filter(expire_date__lt=now).values_list('pk', flat=True)[:batch_size])
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(pk__in=keys).delete()[0]
@@ -0,0 +1,54 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
+from .access import invalidate_access_status
+from .data_version import bump_data_version
+
+# Models shown on the conditional-GET pages, with how to reach their company id
+VERSIONED_MODELS = {
+    'accounts.Company': lambda company: company.pk,
+    'accounts.UserProfile': lambda profile: profile.company_id,
+    'inventory.Product': lambda product: product.company_id,
+    'staff_issues.IssueReport': lambda issue: issue.company_id,
+    'staff_issues.IssueComment': lambda comment: comment.issue.company_id,
+    'staff_management.StaffProfile': lambda staff: staff.user_profile.company_id,
+}
+
+def _bump_for(get_company_id):
+    def receiver(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        try:
+            company_id = get_company_id(instance)
+        except ObjectDoesNotExist:
+            # Parent removed in the same cascade; its own delete bumps the version
+            return
+        if company_id is not None:
+            bump_data_version(company_id)
+    return receiver
+
+for label, get_company_id in VERSIONED_MODELS.items():
+    receiver = _bump_for(get_company_id)
+    # Lazy "app_label.Model" senders, so accounts does not import the other apps' models
+    post_save.connect(receiver, sender=label, weak=False, dispatch_uid=f'data-version-save-{label}')
+    post_delete.connect(receiver, sender=label, weak=False, dispatch_uid=f'data-version-delete-{label}')
+
+# Models whose rows decide whether a user may sign in, with how to reach the user id
+ACCESS_MODELS = {
+    'accounts.UserProfile': lambda profile: profile.user_id,
+    'staff_management.StaffProfile': lambda staff: staff.user_profile.user_id,
+}
+
+def _invalidate_for(get_user_id):
+    def receiver(sender, instance, raw=False, **kwargs):
+        try:
+            user_id = get_user_id(instance)
+        except ObjectDoesNotExist:
+            # Profile removed in the same cascade; its own delete clears the snapshot
+            return
+        invalidate_access_status(user_id)
+    return receiver
+
+for label, get_user_id in ACCESS_MODELS.items():
+    receiver = _invalidate_for(get_user_id)
+    post_save.connect(receiver, sender=label, weak=False, dispatch_uid=f'access-status-save-{label}')
+    post_delete.connect(receiver, sender=label, weak=False, dispatch_uid=f'access-status-delete-{label}')
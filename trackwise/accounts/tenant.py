@@ -0,0 +1,37 @@
+"""
+Request-scoped tenant context.
+
+accounts.backends.TenantModelBackend loads the signed-in user together with
+their UserProfile, Company and StaffProfile in one joined query, and
+TenantMiddleware exposes them as `request.tenant`. Reading any of them
+afterwards costs no query.
+"""
+from django.core.exceptions import ObjectDoesNotExist
+
+class Tenant:
+    """The signed-in user's profile, company and staff record."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def profile(self):
+        """
+        The user's UserProfile.
+
+        Raises:
+            UserProfile.DoesNotExist: if the user has no profile, like request.user.userprofile
+        """
+        return self.user.userprofile
+
+    @property
+    def company(self):
+        return self.profile.company
+
+    @property
+    def staff_profile(self):
+        """The user's StaffProfile, or None (business owners and staff without one)."""
+        try:
+            return self.profile.staffprofile
+        except ObjectDoesNotExist:
+            return None
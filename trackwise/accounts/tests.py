@@ -1,3 +1,343 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import socketserver
+import threading
+from datetime import date, timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from inventory.models import Product
+from staff_management.models import StaffProfile
+from . import access, images
+from .models import Company, EmailOutbox, ImageBlob, ImageVariant, MigrationCheckpoint, UserProfile
+from .outbox import claim_batch, enqueue_email, process_outbox
+from .utils import send_infobip_email
 
-# Create your tests here.
+
+class FailingBackend(BaseEmailBackend):
+    """Email backend standing in for a provider that is down."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('provider unavailable')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server on localhost that records its connections and messages."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        while line := self.rfile.readline():
+            command = line.strip().upper()
+            if command.startswith((b'EHLO', b'HELO')):
+                self.reply('250 localhost')
+            elif command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while (line := self.rfile.readline()) not in (b'.\r\n', b''):
+                    data.append(line)
+                self.server.messages.append(b''.join(data))
+                self.reply('250 OK')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class EmailOutboxTests(TestCase):
+    """Requests only queue emails; process_outbox sends them in batches and backs off on failure."""
+
+    def queue(self, count):
+        for i in range(count):
+            enqueue_email(f'user{i}@example.com', f'Subject {i}', f'<p>Body {i}</p>', f'Body {i}')
+
+    def test_send_only_queues(self):
+        self.assertTrue(send_infobip_email('a@example.com', 'Hello', '<p>Hi</p>'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailOutbox.objects.get().status, 'pending')
+
+    def test_batch_is_delivered(self):
+        self.queue(3)
+        self.assertEqual(process_outbox(batch_size=2), (3, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['user0@example.com', 'user1@example.com', 'user2@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+
+    def test_claimed_emails_are_not_claimed_twice(self):
+        self.queue(2)
+        self.assertEqual(len(claim_batch(10)), 2)
+        self.assertEqual(claim_batch(10), [])
+
+    @override_settings(EMAIL_BACKEND='accounts.tests.FailingBackend', EMAIL_OUTBOX_RETRY_DELAY=60,
+                       EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+    def test_failures_back_off_then_give_up(self):
+        self.queue(1)
+        self.assertEqual(process_outbox(), (0, 1))
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('provider unavailable', email.last_error)
+        self.assertAlmostEqual((email.next_attempt_at - timezone.now()).total_seconds(), 60, delta=5)
+
+        # Not due yet, so nothing is retried
+        self.assertEqual(process_outbox(), (0, 0))
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        process_outbox()
+        email.refresh_from_db()
+        self.assertAlmostEqual((email.next_attempt_at - timezone.now()).total_seconds(), 120, delta=5)
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        process_outbox()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 3))
+
+    def test_batch_reuses_one_smtp_connection(self):
+        server = SMTPStandIn()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.queue(3)
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                               EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.port, EMAIL_USE_TLS=False,
+                               EMAIL_USE_SSL=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD=''):
+            self.assertEqual(process_outbox(batch_size=10), (3, 0))
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(len(server.messages), 3)
+
+
+class StaffLockoutTests(TestCase):
+    """A deactivated staff member is signed out on their next request."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name='Lockout Co')
+        self.owner = User.objects.create_user('owner', password='pw')
+        UserProfile.objects.create(user=self.owner, company=company, role='business_owner')
+        self.staff_user = User.objects.create_user('staff', password='pw')
+        self.staff = StaffProfile.objects.create(
+            user_profile=UserProfile.objects.create(user=self.staff_user, company=company, role='staff'),
+            employee_id='E1', position='Clerk', department='Store', hire_date=date(2024, 1, 1),
+            assigned_locations='Main Office',
+        )
+        self.page = reverse('inventory:inventory_list')
+
+    def test_deactivated_staff_is_signed_out(self):
+        self.assertTrue(self.client.login(username='staff', password='pw'))
+        self.assertEqual(self.client.get(self.page).status_code, 200)
+
+        owner_client = Client()
+        owner_client.force_login(self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            owner_client.post(reverse('staff_management:staff_toggle_status', args=[self.staff.pk]))
+        self.assertEqual(StaffProfile.objects.get(pk=self.staff.pk).status, 'inactive')
+
+        self.assertRedirects(self.client.get(self.page), reverse('accounts:login'), fetch_redirect_response=False)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_joined_profile_needs_no_cache(self):
+        self.client.force_login(self.staff_user, backend='accounts.backends.TenantModelBackend')
+        with mock.patch.object(access, 'cache') as access_cache:
+            self.assertEqual(self.client.get(self.page).status_code, 200)
+        access_cache.get.assert_not_called()
+
+    def test_model_backend_session_is_signed_out(self):
+        # Sessions of plain ModelBackend load the user alone, so their status comes from the cache
+        self.client.force_login(self.staff_user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get(self.page).status_code, 200)
+        self.assertIsNotNone(cache.get(access.ACCESS_STATUS_KEY.format(self.staff_user.pk)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.staff.status = 'on_leave'
+            self.staff.save()
+        self.assertRedirects(self.client.get(self.page), reverse('accounts:login'), fetch_redirect_response=False)
+
+
+class ConditionalGetTests(TestCase):
+    """Company pages answer repeat GETs with 304 until their data, the login or pending messages change."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company = Company.objects.create(name='Etag Co')
+            self.owner = User.objects.create_user('owner', password='pw')
+            UserProfile.objects.create(user=self.owner, company=self.company, role='business_owner')
+            self.product = Product.objects.create(company=self.company, item_name='Bolt', quantity=5, cost_price=1)
+        self.page = reverse('inventory:inventory_list')
+
+    def _etag(self):
+        response = self.client.get(self.page)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def _sign_in(self):
+        self.client.post(reverse('accounts:login'), {'username': 'owner', 'password': 'pw'})
+        # The first page shows the welcome message, so it is never a 304
+        self.assertNotIn('ETag', self.client.get(self.page))
+
+    def test_repeat_get_is_not_modified(self):
+        self._sign_in()
+        etag = self._etag()
+        response = self.client.get(self.page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_write_changes_etag(self):
+        self._sign_in()
+        etag = self._etag()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('inventory:batch_adjust_stock'),
+                             json.dumps([{'product_id': self.product.pk, 'delta': 1}]), content_type='application/json')
+        response = self.client.get(self.page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_login_changes_etag(self):
+        self._sign_in()
+        etag = self._etag()
+        self.client.post(reverse('accounts:logout'))
+        self._sign_in()
+        response = self.client.get(self.page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_pending_message_skips_304(self):
+        self._sign_in()
+        etag = self._etag()
+        # Leaves an error message without changing any data
+        self.client.post(reverse('inventory:product_delete', args=[999999]))
+        response = self.client.get(self.page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertContains(response, 'Product not found.')
+        # Once the message is shown the page is unchanged again
+        self.assertEqual(self.client.get(self.page, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class RegistrationTests(TestCase):
+    """A new business owner is signed in and lands on their dashboard."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_owner_registration_signs_in(self):
+        response = self.client.post(reverse('accounts:business_owner_register'), {
+            'username': 'newowner', 'email': 'owner@example.com', 'first_name': 'New', 'last_name': 'Owner',
+            'password1': 'Str0ng-pass-phrase', 'password2': 'Str0ng-pass-phrase', 'new_company_name': 'New Co',
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.redirect_chain[-1][0], reverse('dashboard:dashboard'))
+        self.assertTrue(response.context['user'].is_authenticated)
+        self.assertEqual(UserProfile.objects.get(user__username='newowner').role, 'business_owner')
+
+
+def _png_bytes(size=(400, 300)):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False)
+class ImageVariantTests(TestCase):
+    """Variants whose background job never ran are made later, never inside a busy upload."""
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Variant Co')
+        owner = User.objects.create_user('owner', password='pw')
+        UserProfile.objects.create(user=owner, company=self.company, role='business_owner')
+        self.client.force_login(owner)
+        # Stored without scheduling, like an upload whose job was lost in a restart
+        self.blob = ImageBlob.store(_png_bytes(), 'image/png')
+        self.product = Product.objects.create(company=self.company, item_name='Lamp', quantity=1, cost_price=1,
+                                              image_blob=self.blob)
+
+    def test_full_queue_skips_the_job(self):
+        self.addCleanup(images._queued.clear)
+        executor = mock.Mock()
+        with mock.patch.object(images, '_get_executor', return_value=(executor, threading.BoundedSemaphore(1))):
+            with mock.patch.object(images, 'generate_variants') as generate:
+                images._submit(1)
+                # The only slot is taken, so the next job is neither queued nor run here
+                images._submit(2)
+                images._submit(1)
+        self.assertEqual(executor.submit.call_count, 1)
+        generate.assert_not_called()
+
+    def test_first_request_makes_missing_variants(self):
+        url = reverse('inventory:product_image', args=[self.product.pk])
+        response = self.client.get(url, {'w': 64})
+        # The original stands in this once
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(ImageVariant.objects.filter(source=self.blob).count(), 6)
+
+        response = self.client.get(url, {'w': 64}, HTTP_ACCEPT='image/webp')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+
+    def test_backfill_command(self):
+        broken = ImageBlob.store(b'not an image', 'image/png')
+        Product.objects.create(company=self.company, item_name='Broken', quantity=1, cost_price=1, image_blob=broken)
+        out = io.StringIO()
+        call_command('generate_image_variants', batch_size=1, stdout=out)
+        self.assertEqual(ImageVariant.objects.filter(source=self.blob).count(), 6)
+        self.assertIn('Created 6 variants for 1 images, skipped 1', out.getvalue())
+
+        # Nothing left to do for complete images
+        out = io.StringIO()
+        call_command('generate_image_variants', stdout=out)
+        self.assertIn('Created 0 variants for 0 images, skipped 1', out.getvalue())
+
+
+class MigrateImagesTests(TestCase):
+    """migrate_images moves legacy base64 images into ImageBlob, reading one image at a time."""
+
+    def setUp(self):
+        company = Company.objects.create(name='Images Co')
+        payload = base64.b64encode(b'\x89PNG' + b'x' * 5000).decode()
+        self.products = [
+            Product.objects.create(company=company, item_name=f'Item {number}', quantity=1, cost_price=1,
+                                   image=payload, image_content_type='image/png')
+            for number in range(5)
+        ]
+
+    def test_batches_load_one_image_per_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            call_command('migrate_images', target='product', batch_size=2, stdout=io.StringIO())
+
+        for product in Product.objects.with_heavy_fields().filter(pk__in=[p.pk for p in self.products]):
+            self.assertIsNone(product.image)
+            self.assertIsNotNone(product.image_blob_id)
+        checkpoint = MigrationCheckpoint.objects.get(name='migrate_images:product')
+        self.assertEqual((checkpoint.processed, checkpoint.failed), (5, 0))
+
+        image_reads = [q['sql'] for q in queries.captured_queries
+                       if q['sql'].startswith('SELECT "inventory_product"."image" ')]
+        self.assertEqual(len(image_reads), 5)
+        self.assertTrue(all(sql.endswith('LIMIT 1') for sql in image_reads), image_reads)
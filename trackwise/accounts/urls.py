@@ -13,6 +13,7 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('profile/edit/', views.edit_profile, name='edit_profile'),
     path('profile/change-password/', views.change_password, name='change_password'),
+    path('profile/<int:pk>/picture/', views.profile_picture, name='profile_picture'),
 
     # API endpoints - You can uncomment these if you're using them
     path('api/check-email/', views.check_email, name='check_email'),
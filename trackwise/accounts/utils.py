@@ -1,11 +1,93 @@
-import logging
+import base64
+import binascii
+import hashlib
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, Http404
+from django.utils.cache import parse_etags, patch_vary_headers
 
-logger = logging.getLogger(__name__)
+# Image URLs carrying ?v=<blob id> never change content, so browsers may keep them for a year
+IMMUTABLE_IMAGE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+REVALIDATE_IMAGE_CACHE_CONTROL = 'private, no-cache'
+
+def decode_base64_image(value):
+    """
+    Decode a legacy base64 image column, with or without a `data:...;base64,` prefix.
+    
+    Returns:
+        tuple: (raw bytes, content type from the prefix or None), or (None, None) if undecodable
+    """
+    if not value:
+        return None, None
+    content_type = None
+    if value.startswith('data:'):
+        header, _, value = value.partition(',')
+        content_type = header[5:].split(';', 1)[0] or None
+    try:
+        return base64.b64decode(value), content_type
+    except (binascii.Error, ValueError):
+        return None, None
+
+def image_response(request, blob_id, legacy_loader=None):
+    """
+    Serve an image with a strong ETag and 304 handling.
+    
+    Args:
+        request: The current request; `?v=<blob id>` marks a content-addressed URL, `?w=` a display width
+        blob_id: ImageBlob primary key, or None for rows still holding base64 text
+        legacy_loader: Callable returning (base64 text, content type) for unmigrated rows
+    
+    Returns:
+        HttpResponse with the image bytes, or HttpResponseNotModified
+    """
+    from .images import ensure_variants, pick_variant
+    from .models import ImageBlob
+
+    if blob_id:
+        blob = ImageBlob.objects.filter(pk=blob_id).only('sha256', 'content_type').first()
+        if blob is None:
+            raise Http404('Image not found')
+        # Serve the smallest generated variant that fits; fall back to the original until variants exist
+        width = request.GET.get('w')
+        variant_id = pick_variant(blob_id, int(width) if width and width.isdigit() else None,
+                                  request.headers.get('Accept', ''))
+        if variant_id:
+            blob = ImageBlob.objects.filter(pk=variant_id).only('sha256', 'content_type').first() or blob
+        else:
+            # Its generation job was skipped or lost (e.g. in a restart); ask again
+            ensure_variants(blob_id)
+        etag = f'"{blob.sha256}"'
+        # Only a finished variant is final for this URL; the original is a stand-in
+        immutable = bool(variant_id) and request.GET.get('v') == str(blob_id)
+        content_type = blob.content_type
+        content = None
+    else:
+        text, content_type = legacy_loader() if legacy_loader else (None, None)
+        content, prefixed_type = decode_base64_image(text)
+        if content is None:
+            raise Http404('Image not found')
+        content_type = content_type or prefixed_type or 'image/jpeg'
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+        immutable = False
+
+    cache_control = IMMUTABLE_IMAGE_CACHE_CONTROL if immutable else REVALIDATE_IMAGE_CACHE_CONTROL
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        if content is None:
+            content = bytes(ImageBlob.objects.values_list('data', flat=True).get(pk=blob.pk))
+        response = HttpResponse(content, content_type=content_type)
+        response['Content-Length'] = len(content)
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    patch_vary_headers(response, ['Accept'])
+    return response
 
 def send_infobip_email(to_email, subject, html_content, text_content=None):
     """
-    Send email using Infobip API
+    Queue an email for delivery by the process_outbox worker (see accounts.outbox)
+    
+    Infobip is used when INFOBIP_API_KEY is set, with Django's email backend as
+    the fallback; the request itself never talks to a mail provider.
     
     Args:
         to_email: Recipient email address
@@ -14,75 +96,11 @@ def send_infobip_email(to_email, subject, html_content, text_content=None):
         text_content: Plain text content (optional)
     
     Returns:
-        bool: True if successful, False otherwise
+        bool: True once the email is queued
     """
-    
-    # If no Infobip API key, fall back to Django's send_mail
-    if not getattr(settings, 'INFOBIP_API_KEY', None):
-        logger.warning("Infobip API key not configured, falling back to Django send_mail")
-        from django.core.mail import send_mail
-        try:
-            send_mail(
-                subject=subject,
-                message=text_content or html_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[to_email],
-                html_message=html_content,
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            logger.error(f"Fallback email sending failed: {str(e)}")
-            return False
-    
-    try:
-        # IMPORTANT: For your specific base URL (v35rjm.api.infobip.com)
-        # We need to ensure it has the https:// prefix for API calls
-        base_url = settings.INFOBIP_BASE_URL
-        if not base_url.startswith('http'):
-            base_url = f"https://{base_url}"
-        
-        # Initialize Infobip configuration with your specific base URL
-        configuration = configuration(
-            host=base_url,  # This becomes https://v35rjm.api.infobip.com
-            api_key_prefix="App",
-            api_key=settings.INFOBIP_API_KEY,
-        )
-        
-        api_client = api_client(configuration=configuration)
-        email_channel = email_channel(api_client)
-        
-        # Prepare the email
-        response = email_channel.send_email_message(
-            from_email=settings.INFOBIP_SENDER_EMAIL,
-            to=[to_email],
-            subject=subject,
-            html=html_content,
-            text=text_content or html_content,
-        )
-        
-        logger.info(f"Infobip email sent successfully to {to_email}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Infobip email sending failed for {to_email}: {str(e)}")
-        
-        # Try fallback to SMTP (using the same base URL)
-        try:
-            from django.core.mail import send_mail
-            send_mail(
-                subject=subject,
-                message=text_content or html_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[to_email],
-                html_message=html_content,
-                fail_silently=True,
-            )
-            logger.info(f"Fallback SMTP email sent to {to_email}")
-            return True
-        except Exception as smtp_error:
-            logger.error(f"All email methods failed for {to_email}: {smtp_error}")
-            return False
+    from .outbox import enqueue_email
+    enqueue_email(to_email, subject, html_content, text_content)
+    return True
 
 def send_verification_email_using_infobip(email, otp_code):
     """
@@ -157,5 +175,5 @@ def send_verification_email_using_infobip(email, otp_code):
     TrackWise Team
     """
     
-    # Send using Infobip
+    # Queued; the outbox worker sends it through Infobip
     return send_infobip_email(email, subject, html_content, text_content)
\ No newline at end of file
@@ -5,7 +5,9 @@ from django.contrib import messages
 from django.urls import reverse
 from .forms import BusinessOwnerRegistrationForm, StaffRegistrationForm, CustomAuthenticationForm, BusinessOwnerProfileForm, CustomPasswordChangeForm, CompanyForm
 from .models import UserProfile, Company
-from django.http import JsonResponse
+from .utils import image_response
+from inventory.services import apply_company_low_stock_threshold, rebuild_inventory_summary
+from django.http import JsonResponse, Http404
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
@@ -56,8 +58,8 @@ def business_owner_register(request):
             #         'next_url': 'accounts:login'
             #     })
             
-            # Login the user immediately
-            login(request, user)
+            # Login the user immediately; the user never went through authenticate(), so name the backend
+            login(request, user, backend='accounts.backends.TenantModelBackend')
             messages.success(request, 'Business Owner account created successfully! Welcome to TrackWise.')
             return redirect('dashboard:dashboard')
         else:
@@ -159,10 +161,20 @@ def logout_view(request):
     messages.info(request, 'You have been logged out successfully.')
     return redirect('accounts:login')
 
+def _save_company_form(company_form):
+    """Save the company settings and re-derive what depends on the low-stock threshold and time zone."""
+    company = company_form.save()
+    if 'low_stock_threshold' in company_form.changed_data:
+        apply_company_low_stock_threshold(company)
+    if 'time_zone' in company_form.changed_data:
+        # Today's update counter covers the old local day; recount it for the new one
+        rebuild_inventory_summary(company.pk)
+    return company
+
 @login_required
 def edit_profile(request):
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'Profile not found.')
         return redirect('dashboard:dashboard')
@@ -196,7 +208,7 @@ def edit_profile(request):
             company_form = CompanyForm(request.POST, instance=company)
             
             if company_form.is_valid():
-                company_form.save()
+                _save_company_form(company_form)
                 messages.success(request, 'Company information updated successfully!')
                 return redirect('accounts:edit_profile')
             else:
@@ -213,7 +225,7 @@ def edit_profile(request):
             
             if profile_form.is_valid() and company_form.is_valid():
                 profile_form.save()
-                company_form.save()
+                _save_company_form(company_form)
                 messages.success(request, 'Profile updated successfully!')
                 return redirect('accounts:edit_profile')
             else:
@@ -230,6 +242,24 @@ def edit_profile(request):
     }
     return render(request, 'accounts/edit_profile.html', context)
 
+@login_required
+def profile_picture(request, pk):
+    """Serve a profile picture to users of the same company with ETag/304 support."""
+    try:
+        viewer = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        raise Http404('Profile not found')
+    
+    profile = get_object_or_404(
+        UserProfile.objects.only('id', 'company_id', 'profile_picture_blob_id'),
+        pk=pk, company_id=viewer.company_id
+    )
+    return image_response(
+        request,
+        profile.profile_picture_blob_id,
+        lambda: UserProfile.objects.filter(pk=pk).values_list('profile_picture', 'profile_picture_content_type').first(),
+    )
+
 @login_required
 def change_password(request):
     if request.method == 'POST':
@@ -0,0 +1,118 @@
+"""
+Company activity feed shown on the dashboards.
+
+Writers describe what happened with ActivityEvent rows; they are collected per
+call and inserted with one bulk INSERT once the surrounding transaction
+commits, so a rolled-back change leaves no event and a batch of changes costs
+one statement. Readers page through the feed newest first with a keyset cursor
+on (created_at, id), which the activity_company_created_idx index serves as a
+single range scan. The prune_activity command deletes old rows.
+"""
+import base64
+import binascii
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from accounts.data_version import bump_data_version
+from .models import ActivityEvent
+
+ACTIVITY_PAGE_SIZE = 10
+
+def actor_name(profile):
+    """Display name of a UserProfile for the feed, or '' for system changes."""
+    if profile is None:
+        return ''
+    return profile.user.get_full_name() or profile.user.username
+
+def activity_event(company_id, kind, subject, detail='', actor=None):
+    """An unsaved ActivityEvent, for passing to record_activities."""
+    return ActivityEvent(
+        company_id=company_id, kind=kind, subject=subject[:200], detail=detail[:200],
+        actor_name=actor_name(actor)[:150], created_at=timezone.now(),
+    )
+
+def record_activities(events):
+    """Insert events with one statement after the current transaction commits."""
+    events = list(events)
+    if not events:
+        return
+
+    def flush():
+        ActivityEvent.objects.bulk_create(events)
+        # The feed is part of the cached dashboard, so it must move the version after the rows exist
+        for company_id in {event.company_id for event in events}:
+            bump_data_version(company_id)
+
+    transaction.on_commit(flush)
+
+def record_activity(company_id, kind, subject, detail='', actor=None):
+    """Record one event; see record_activities."""
+    record_activities([activity_event(company_id, kind, subject, detail, actor)])
+
+def encode_cursor(event):
+    payload = json.dumps([event.created_at.isoformat(), event.pk])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """
+    Returns:
+        tuple: (created_at, id), or None if the token is missing or malformed
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            return None
+        return created_at, int(pk)
+    except (binascii.Error, ValueError, TypeError, UnicodeError):
+        return None
+
+def activity_page(company_id, cursor=None, page_size=ACTIVITY_PAGE_SIZE):
+    """
+    One page of a company's feed, newest first.
+
+    Args:
+        company_id: Company whose events to read
+        cursor: Token from a previous page, or None for the latest events
+        page_size: Number of events per page
+
+    Returns:
+        tuple: (list of events, cursor for the next page or None)
+    """
+    events = ActivityEvent.objects.filter(company_id=company_id).order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        events = events.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    # One extra row tells us whether another page exists without a COUNT
+    rows = list(events[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+def prune_activity(days=None, batch_size=5000):
+    """
+    Delete events older than `days` (default ACTIVITY_RETENTION_DAYS), in batches.
+
+    Returns:
+        int: number of events deleted
+    """
+    if days is None:
+        days = getattr(settings, 'ACTIVITY_RETENTION_DAYS', 90)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        # Short transactions so the feed stays writable while a large backlog is cleared
+        ids = list(ActivityEvent.objects.filter(created_at__lt=cutoff).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += ActivityEvent.objects.filter(pk__in=ids).delete()[0]
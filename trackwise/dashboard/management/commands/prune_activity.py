@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.activity import prune_activity
+
+class Command(BaseCommand):
+    help = 'Delete dashboard activity events older than the retention period (run daily, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help=f'Keep this many days of events (default: ACTIVITY_RETENTION_DAYS, '
+                                 f'currently {getattr(settings, "ACTIVITY_RETENTION_DAYS", 90)})')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Events deleted per statement (default: 5000)')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days cannot be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        deleted = prune_activity(options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} activity events"))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0013_company_low_stock_threshold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('product_added', 'Product Added'), ('product_edited', 'Product Edited'), ('product_deleted', 'Product Deleted'), ('stock_adjusted', 'Stock Adjusted'), ('products_imported', 'Products Imported'), ('staff_added', 'Staff Added'), ('staff_updated', 'Staff Updated'), ('issue_reported', 'Issue Reported'), ('issue_status', 'Issue Status Changed'), ('issue_comment', 'Issue Comment')], max_length=20)),
+                ('subject', models.CharField(max_length=200)),
+                ('detail', models.CharField(blank=True, max_length=200)),
+                ('actor_name', models.CharField(blank=True, max_length=150)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.company')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', '-created_at', '-id'], name='activity_company_created_idx'), models.Index(fields=['created_at'], name='activity_created_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,60 @@
 from django.db import models
+from django.utils import timezone
+from accounts.models import Company
 
-# Create your models here.
+class ActivityEvent(models.Model):
+    """
+    One line of a company's dashboard activity feed.
+
+    Written by the product, stock, staff and issue paths through dashboard.activity
+    and read newest first from the (company, created_at, id) index. Rows carry a
+    copy of the subject's name so the feed needs no joins and survives deletes.
+    """
+    KIND_CHOICES = [
+        ('product_added', 'Product Added'),
+        ('product_edited', 'Product Edited'),
+        ('product_deleted', 'Product Deleted'),
+        ('stock_adjusted', 'Stock Adjusted'),
+        ('products_imported', 'Products Imported'),
+        ('staff_added', 'Staff Added'),
+        ('staff_updated', 'Staff Updated'),
+        ('issue_reported', 'Issue Reported'),
+        ('issue_status', 'Issue Status Changed'),
+        ('issue_comment', 'Issue Comment'),
+    ]
+    # Font Awesome icon shown next to each kind in the feed
+    KIND_ICONS = {
+        'product_added': 'fa-plus',
+        'product_edited': 'fa-edit',
+        'product_deleted': 'fa-trash',
+        'stock_adjusted': 'fa-exchange-alt',
+        'products_imported': 'fa-file-import',
+        'staff_added': 'fa-user-plus',
+        'staff_updated': 'fa-user-edit',
+        'issue_reported': 'fa-exclamation-triangle',
+        'issue_status': 'fa-clipboard-check',
+        'issue_comment': 'fa-comment',
+    }
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Name of the product, staff member or issue at the time of the event
+    subject = models.CharField(max_length=200)
+    detail = models.CharField(max_length=200, blank=True)
+    # Name of the user who did it, copied for the same reason as subject
+    actor_name = models.CharField(max_length=150, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', '-created_at', '-id'], name='activity_company_created_idx'),
+            # Retention deletes by age across all companies
+            models.Index(fields=['created_at'], name='activity_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.subject}"
+
+    @property
+    def icon(self):
+        return self.KIND_ICONS.get(self.kind, 'fa-history')
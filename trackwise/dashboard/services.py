@@ -0,0 +1,112 @@
+"""
+Cached dashboard statistics.
+
+The numbers and product lists on both dashboards are computed once per company
+and data version (accounts.data_version), then served from the Django cache
+until a Product, UserProfile or StaffProfile write (or a new activity event)
+bumps the version or the entry's DASHBOARD_CACHE_TTL runs out.
+
+When an entry is missing, one request takes a short-lived lock and recomputes
+it while concurrent requests for the same company wait for the result instead
+of all running the same queries (cache stampede).
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from accounts.data_version import get_data_version
+from accounts.models import UserProfile
+from inventory.models import Product, HAS_LEGACY_IMAGE
+from inventory.services import get_inventory_summary
+from .activity import activity_page
+
+DASHBOARD_CACHE_KEY = 'dashboard:{company_id}:{version}:{day}'
+
+# How long a recompute may hold the lock, and how long others wait for it
+RECOMPUTE_LOCK_TIMEOUT = 10
+RECOMPUTE_WAIT = 2.0
+RECOMPUTE_POLL_INTERVAL = 0.05
+
+# Only the columns the dashboard templates show; the thumbnail URL comes from image_blob and has_legacy_image
+DASHBOARD_PRODUCT_FIELDS = (
+    'id', 'item_name', 'category', 'quantity', 'unit_of_measure', 'cost_price', 'stock_status', 'image_blob',
+)
+
+def _ttl():
+    return getattr(settings, 'DASHBOARD_CACHE_TTL', 300)
+
+def _product_card(product):
+    """
+    What the dashboard product cards show, as a plain dict.
+
+    Cached entries hold these instead of pickled Product instances, so they stay a
+    few hundred bytes per product whatever the model carries.
+    """
+    return {
+        'id': product.pk,
+        'item_name': product.item_name,
+        'quantity': product.quantity,
+        'unit_of_measure': product.unit_of_measure,
+        'cost_price': product.cost_price,
+        'stock_status': product.stock_status,
+        'get_stock_status_display': product.get_stock_status_display(),
+        'get_category_display': product.get_category_display(),
+        'image_thumbnail_url': product.image_thumbnail_url,
+    }
+
+def compute_dashboard_data(company):
+    """
+    Query everything both dashboards show for a company.
+
+    Returns:
+        dict: the inventory summary stats, total_staff, recent_updates (product
+              writes since local midnight), recent_products (card dicts, see
+              _product_card), recent_activity (latest ActivityEvents) and
+              activity_cursor (for the next feed page)
+    """
+    products = Product.objects.filter(company=company).only(*DASHBOARD_PRODUCT_FIELDS).annotate(
+        has_legacy_image=HAS_LEGACY_IMAGE
+    )
+    stats = get_inventory_summary(company)
+    recent_activity, activity_cursor = activity_page(company.pk)
+    return {
+        'stats': stats,
+        'total_staff': UserProfile.objects.filter(company=company, role='staff').count(),
+        # Rolling counter on the summary row, restarted at company-local midnight
+        'recent_updates': stats['updates_today'],
+        'recent_products': [_product_card(product) for product in products.order_by('-created_at')[:5]],
+        'recent_activity': recent_activity,
+        'activity_cursor': activity_cursor,
+    }
+
+def get_dashboard_data(company):
+    """
+    Dashboard data of a company from the cache, computing it on a miss.
+
+    Returns:
+        dict: as compute_dashboard_data
+    """
+    key = DASHBOARD_CACHE_KEY.format(
+        company_id=company.pk, version=get_data_version(company.pk), day=company.local_date().isoformat()
+    )
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, timeout=RECOMPUTE_LOCK_TIMEOUT):
+        # Someone else is computing this entry; wait for it rather than repeating the queries
+        deadline = time.monotonic() + RECOMPUTE_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(RECOMPUTE_POLL_INTERVAL)
+            data = cache.get(key)
+            if data is not None:
+                return data
+        # The other request is slow or died; compute without caching over its result
+        return compute_dashboard_data(company)
+
+    try:
+        data = compute_dashboard_data(company)
+        cache.set(key, data, timeout=_ttl())
+    finally:
+        cache.delete(lock_key)
+    return data
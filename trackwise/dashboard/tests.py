@@ -1,3 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from accounts.models import Company, UserProfile
+from inventory.models import Product
+from inventory.tests import assert_renders_selected_columns
 
-# Create your tests here.
+
+class DashboardColumnTests(TestCase):
+    """The dashboards select only the product and profile columns they show."""
+
+    def setUp(self):
+        cache.clear()
+        # Run the on-commit data version bumps, so no cached dashboard of an earlier test can match
+        with self.captureOnCommitCallbacks(execute=True):
+            company = Company.objects.create(name='Columns Co')
+            self.owner = User.objects.create_user('owner', password='pw')
+            UserProfile.objects.create(user=self.owner, company=company, role='business_owner',
+                                       notes='Owner note. ' * 50)
+            Product.objects.create(company=company, item_name='Widget', quantity=3, cost_price=2)
+            # A product whose image was never moved to ImageBlob
+            self.legacy = Product.objects.create(company=company, item_name='Old Widget', quantity=3, cost_price=2,
+                                                 image='A' * 200000)
+
+    def test_dashboard_skips_unrendered_columns(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('dashboard:dashboard'))
+        self.assertContains(response, 'Widget')
+        self.assertContains(response, reverse('inventory:product_image', args=[self.legacy.pk]))
+        assert_renders_selected_columns(self, response)
@@ -5,4 +5,5 @@ app_name = 'dashboard'
 
 urlpatterns = [
     path('', views.dashboard_view, name='dashboard'),
+    path('activity/', views.activity_feed_page, name='activity_page'),
 ]
\ No newline at end of file
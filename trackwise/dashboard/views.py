@@ -1,15 +1,24 @@
 from django.shortcuts import render
+from django.http import Http404
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.contrib.auth.decorators import login_required
 from accounts.models import UserProfile, Company
-from inventory.models import Product
-from django.utils import timezone
-from datetime import timedelta
+from accounts.data_version import company_data_condition
+from .activity import activity_page
+from .services import get_dashboard_data
+
+def _activity_page_url(cursor):
+    if not cursor:
+        return None
+    return f"{reverse('dashboard:activity_page')}?{urlencode({'after': cursor})}"
 
 @login_required
+@company_data_condition
 def dashboard_view(request):
     # Ensure user has a profile
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         # Create a default profile if it doesn't exist
         company = Company.objects.first()
@@ -17,67 +26,46 @@ def dashboard_view(request):
             company = Company.objects.create(name="Default Company")
         profile = UserProfile.objects.create(user=request.user, role='staff', company=company)
     
-    # Calculate dashboard statistics
+    # Statistics and product lists come from the per-company dashboard cache
+    data = get_dashboard_data(profile.company)
+    stats = data['stats']
+    
+    context = {
+        'profile': profile,
+        'total_products': stats['total_products'],
+        'low_stock': stats['low_stock_count'],
+        'out_of_stock': stats['out_of_stock_count'],
+        'recent_products': data['recent_products'],
+        'recent_activity': data['recent_activity'],
+        'activity_next_url': _activity_page_url(data['activity_cursor']),
+    }
+    
     if profile.role == 'business_owner':
-        # Get products for this company
-        products = Product.objects.filter(company=profile.company)
-        
-        # Calculate statistics
-        total_products = products.count()
-        low_stock = products.filter(quantity__gt=0, quantity__lte=10).count()  # 10 or less is low stock
-        out_of_stock = products.filter(quantity=0).count()
-        
-        # Get total staff count (users in the same company with staff role)
-        total_staff = UserProfile.objects.filter(company=profile.company, role='staff').count()
-        
-        # Get recent products (last 5 added)
-        recent_products = products.order_by('-created_at')[:5]
-        
-        # Calculate total inventory value
-        total_inventory_value = sum(product.total_value for product in products)
-        
-        # Get recently updated products for activity feed
-        recent_activity = products.order_by('-updated_at')[:10]
-        
-        context = {
-            'profile': profile,
-            'total_products': total_products,
-            'low_stock': low_stock,
-            'out_of_stock': out_of_stock,
-            'total_staff': total_staff,
-            'recent_products': recent_products,
-            'recent_activity': recent_activity,
-            'total_inventory_value': total_inventory_value,
-        }
+        context.update({
+            'total_staff': data['total_staff'],
+            'total_inventory_value': stats['total_inventory_value'],
+        })
         template = 'dashboard/business_owner_dashboard.html'
     else:
-        # Staff dashboard - calculate similar statistics but for staff view
-        products = Product.objects.filter(company=profile.company)
-        
-        # Calculate statistics for staff
-        total_products = products.count()
-        low_stock = products.filter(quantity__gt=0, quantity__lte=10).count()
-        out_of_stock = products.filter(quantity=0).count()
-        
-        # Get recent products (last 5 added)
-        recent_products = products.order_by('-created_at')[:5]
-        
-        # Get recently updated products for activity feed
-        recent_activity = products.order_by('-updated_at')[:10]
-        
-        # Count today's updates (products updated today)
-        today = timezone.now().date()
-        recent_updates = products.filter(updated_at__date=today).count()
-        
-        context = {
-            'profile': profile,
-            'total_products': total_products,
-            'low_stock': low_stock,
-            'out_of_stock': out_of_stock,
-            'recent_updates': recent_updates,
-            'recent_products': recent_products,
-            'recent_activity': recent_activity,
-        }
+        # Products updated today
+        context['recent_updates'] = data['recent_updates']
         template = 'dashboard/staff_dashboard.html'
     
-    return render(request, template, context)
\ No newline at end of file
+    return render(request, template, context)
+
+@login_required
+@company_data_condition
+def activity_feed_page(request):
+    """HTML items for the next page of the dashboard activity feed."""
+    try:
+        profile = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        raise Http404('User profile not found')
+    
+    events, next_cursor = activity_page(profile.company_id, request.GET.get('after'))
+    response = render(request, 'dashboard/partials/activity_items.html', {'events': events})
+    # The client reads the next page's URL from this header; absent on the last page
+    next_url = _activity_page_url(next_cursor)
+    if next_url:
+        response['X-Next-Page'] = next_url
+    return response
@@ -0,0 +1,139 @@
+"""
+In-memory prefix index of product names for autocomplete.
+
+Each company's names are held as one sorted list searched with bisect, so a
+lookup is two binary searches and a slice, with no database round trip. Indexes
+are built on first use, patched by the Product signals and evicted least
+recently used once the total number of names held passes
+AUTOCOMPLETE_MAX_NAMES.
+
+The index lives in each worker process. Changes made in another process are
+picked up when the entry expires after AUTOCOMPLETE_TTL seconds.
+"""
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from .models import Product
+
+AUTOCOMPLETE_LIMIT = 10
+
+class PrefixIndex:
+    """Sorted (lowercased name, product id) pairs of one company, plus the display names."""
+
+    def __init__(self, products):
+        self.names = {}
+        self.keys = []
+        for pk, item_name in products:
+            self.names[pk] = item_name
+            self.keys.append((item_name.lower(), pk))
+        self.keys.sort()
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, pk, item_name):
+        self.remove(pk)
+        self.names[pk] = item_name
+        bisect.insort(self.keys, (item_name.lower(), pk))
+
+    def remove(self, pk):
+        item_name = self.names.pop(pk, None)
+        if item_name is None:
+            return
+        key = (item_name.lower(), pk)
+        position = bisect.bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    def complete(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """Up to `limit` (id, name) pairs whose name starts with `prefix`, ignoring case, in name order."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, (prefix,))
+        results = []
+        for key, pk in self.keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            results.append((pk, self.names[pk]))
+        return results
+
+_indexes = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+
+def _max_names():
+    return getattr(settings, 'AUTOCOMPLETE_MAX_NAMES', 200000)
+
+def _ttl():
+    return getattr(settings, 'AUTOCOMPLETE_TTL', 300)
+
+def _evict():
+    """Drop least recently used companies until the held names fit the budget; call with _lock held."""
+    global _size
+    # The most recently used index always stays, even if it alone is over budget
+    while _size > _max_names() and len(_indexes) > 1:
+        _, index = _indexes.popitem(last=False)
+        _size -= len(index)
+
+def get_index(company_id):
+    """The prefix index of a company, building it from the database if it is missing or expired."""
+    global _size
+    with _lock:
+        index = _indexes.get(company_id)
+        if index is not None and time.monotonic() - index.built_at < _ttl():
+            _indexes.move_to_end(company_id)
+            return index
+
+    # Build outside the lock so a large company does not block lookups for the others
+    index = PrefixIndex(Product.objects.filter(company_id=company_id).values_list('pk', 'item_name').iterator())
+
+    with _lock:
+        old = _indexes.pop(company_id, None)
+        if old is not None:
+            _size -= len(old)
+        _indexes[company_id] = index
+        _size += len(index)
+        _evict()
+    return index
+
+def complete(company_id, prefix, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Product names of a company starting with `prefix`.
+
+    Returns:
+        list: up to `limit` (product id, item name) pairs in name order
+    """
+    if not prefix:
+        return []
+    index = get_index(company_id)
+    with _lock:
+        return index.complete(prefix, limit)
+
+def product_saved(company_id, pk, item_name):
+    """Update an already loaded index after a product is created or renamed."""
+    global _size
+    with _lock:
+        index = _indexes.get(company_id)
+        if index is not None:
+            before = len(index)
+            index.add(pk, item_name)
+            _size += len(index) - before
+
+def product_deleted(company_id, pk):
+    global _size
+    with _lock:
+        index = _indexes.get(company_id)
+        if index is not None:
+            before = len(index)
+            index.remove(pk)
+            _size += len(index) - before
+
+def invalidate(company_id):
+    """Forget a company's index, e.g. after a bulk import; it is rebuilt on next use."""
+    global _size
+    with _lock:
+        index = _indexes.pop(company_id, None)
+        if index is not None:
+            _size -= len(index)
@@ -14,7 +14,7 @@ class ProductForm(forms.ModelForm):
     
     class Meta:
         model = Product
-        fields = ['item_name', 'category', 'quantity', 'unit_of_measure', 'cost_price']
+        fields = ['item_name', 'category', 'quantity', 'unit_of_measure', 'cost_price', 'reorder_point']
         widgets = {
             'item_name': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -35,6 +35,10 @@ class ProductForm(forms.ModelForm):
                 'placeholder': 'Enter cost price',
                 'step': '0.01'
             }),
+            'reorder_point': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Company default'
+            }),
         }
     
     def __init__(self, *args, **kwargs):
@@ -43,6 +47,17 @@ class ProductForm(forms.ModelForm):
             if hasattr(field, 'widget') and hasattr(field.widget, 'attrs'):
                 field.widget.attrs.update({'class': 'form-control'})
     
+    def clean_item_name(self):
+        """Item names are unique per company; the company is not a form field, so check it here."""
+        item_name = self.cleaned_data.get('item_name')
+        if item_name and self.instance.company_id:
+            duplicates = Product.objects.filter(company_id=self.instance.company_id, item_name=item_name)
+            if self.instance.pk:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
+                raise forms.ValidationError("A product with this name already exists.")
+        return item_name
+    
     def clean_image_upload(self):
         """Clean and validate uploaded image."""
         image = self.cleaned_data.get('image_upload')
@@ -0,0 +1,240 @@
+"""
+Bulk product import from CSV or XLSX files.
+
+Rows are streamed from the upload, checked with the same field rules as
+ProductForm and written in chunks: one upsert per chunk keyed on
+(company, item_name), so existing products are updated and new ones created.
+Memory use stays flat however large the file is.
+"""
+import csv
+import io
+import time
+import zipfile
+from django import forms
+from django.db import transaction
+from django.utils import timezone
+from accounts.data_version import bump_data_version
+from dashboard.activity import record_activity
+from . import autocomplete
+from .forms import ProductForm
+from .ledger import record_movements
+from .models import Product
+from .search import index_products
+from .services import apply_inventory_deltas
+
+IMPORT_CHUNK_SIZE = 1000
+
+# Only the first errors are kept for display; the count covers all of them
+MAX_REPORTED_ERRORS = 200
+
+IMPORT_FIELDS = ['item_name', 'category', 'quantity', 'unit_of_measure', 'cost_price']
+
+# Accepted column headings (lower case, spaces as underscores) -> field
+HEADER_ALIASES = {
+    'item_name': 'item_name',
+    'name': 'item_name',
+    'product': 'item_name',
+    'product_name': 'item_name',
+    'category': 'category',
+    'quantity': 'quantity',
+    'qty': 'quantity',
+    'unit_of_measure': 'unit_of_measure',
+    'unit': 'unit_of_measure',
+    'cost_price': 'cost_price',
+    'cost': 'cost_price',
+    'price': 'cost_price',
+}
+
+class ImportFileError(Exception):
+    """The file as a whole cannot be imported (unknown type, missing columns)."""
+
+def _read_csv(uploaded_file):
+    # Django uploads wrap the real file object, which TextIOWrapper needs
+    text = io.TextIOWrapper(getattr(uploaded_file, 'file', uploaded_file), encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"Could not read the CSV file: {str(e)}")
+    finally:
+        # Leave the underlying upload open for Django to clean up
+        text.detach()
+
+def _read_xlsx(uploaded_file):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+    try:
+        # read_only streams rows from the zip instead of building the whole sheet
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as e:
+        raise ImportFileError(f"Could not read the Excel file: {str(e)}")
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ['' if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+def iter_rows(uploaded_file, filename):
+    """
+    Stream the data rows of an upload as dicts keyed by product field.
+
+    Returns:
+        generator: (row number in the file, {field: raw value}) pairs
+
+    Raises:
+        ImportFileError: for an unsupported file type or missing required columns
+    """
+    name = filename.lower()
+    if name.endswith('.csv'):
+        rows = _read_csv(uploaded_file)
+    elif name.endswith('.xlsx'):
+        rows = _read_xlsx(uploaded_file)
+    else:
+        raise ImportFileError('Upload a .csv or .xlsx file.')
+
+    header = next(rows, None)
+    if not header:
+        raise ImportFileError('The file is empty.')
+    columns = {}
+    for index, heading in enumerate(header):
+        field = HEADER_ALIASES.get(str(heading).strip().lower().replace(' ', '_'))
+        if field and field not in columns:
+            columns[field] = index
+    missing = [field for field in ('item_name', 'quantity', 'cost_price') if field not in columns]
+    if missing:
+        raise ImportFileError(f"Missing required column(s): {', '.join(missing)}")
+
+    for row_number, row in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in row):
+            continue
+        yield row_number, {
+            field: row[index] if index < len(row) else ''
+            for field, index in columns.items()
+        }
+
+class RowValidator:
+    """Checks raw rows with ProductForm's field rules, without building a form per row."""
+
+    def __init__(self):
+        self.fields = {name: field for name, field in ProductForm().fields.items() if name in IMPORT_FIELDS}
+        # Spreadsheets usually carry the display labels, e.g. "Food & Beverages"
+        self.choice_labels = {
+            'category': {label.lower(): value for value, label in Product.CATEGORY_CHOICES},
+            'unit_of_measure': {label.lower(): value for value, label in Product.UNIT_CHOICES},
+        }
+
+    def clean(self, raw):
+        """
+        Returns:
+            tuple: (cleaned values, None) or (None, error message)
+        """
+        cleaned = {}
+        for name, field in self.fields.items():
+            value = raw.get(name, '')
+            if isinstance(value, str):
+                value = value.strip()
+            if name in self.choice_labels:
+                if value:
+                    value = self.choice_labels[name].get(str(value).lower(), str(value).lower())
+                else:
+                    # Optional columns fall back to the model default, as the add form's initial value does
+                    value = Product._meta.get_field(name).default
+            try:
+                cleaned[name] = field.clean(value)
+            except forms.ValidationError as e:
+                return None, f"{name}: {' '.join(e.messages)}"
+        if cleaned['quantity'] < 0:
+            return None, 'quantity: Quantity cannot be negative.'
+        return cleaned, None
+
+def _write_chunk(company, chunk, actor):
+    """Upsert one chunk of cleaned rows and keep the summary and ledger in step."""
+    names = list(chunk)
+    with transaction.atomic():
+        existing = {
+            item_name: (quantity, cost_price, low_stock_threshold)
+            for item_name, quantity, cost_price, low_stock_threshold in Product.objects.select_for_update()
+            .filter(company=company, item_name__in=names)
+            .values_list('item_name', 'quantity', 'cost_price', 'low_stock_threshold')
+        }
+        now = timezone.now()
+        Product.objects.bulk_create(
+            [Product(company=company, created_at=now, updated_at=now,
+                     low_stock_threshold=company.low_stock_threshold, **values) for values in chunk.values()],
+            update_conflicts=True,
+            unique_fields=['company', 'item_name'],
+            update_fields=['category', 'quantity', 'unit_of_measure', 'cost_price', 'updated_at'],
+        )
+
+        apply_inventory_deltas(company.pk, [
+            # Updated rows keep their threshold; new ones start from the company default
+            (existing.get(name), (values['quantity'], values['cost_price'],
+                                  existing[name][2] if name in existing else company.low_stock_threshold))
+            for name, values in chunk.items()
+        ])
+        ids = dict(Product.objects.filter(company=company, item_name__in=names).values_list('item_name', 'pk'))
+        record_movements(company.pk, {
+            ids[name]: values['quantity'] - (existing[name][0] if name in existing else 0)
+            for name, values in chunk.items()
+        }, reason='import', actor=actor)
+        # bulk_create sends no post_save, so refresh the search entries here
+        index_products(ids.values())
+        bump_data_version(company.pk)
+    return len(chunk) - len(existing), len(existing)
+
+def import_products(company, uploaded_file, filename, actor=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import products from a CSV or XLSX upload into a company.
+
+    Rows with errors are skipped and reported; every valid row is saved. A name
+    that appears again later in the file updates the earlier row.
+
+    Args:
+        company: Company that receives the products
+        uploaded_file: Binary file object of the upload
+        filename: Original file name, used to pick the reader
+        actor: UserProfile recorded on the stock ledger and activity feed
+        chunk_size: Rows written per transaction
+
+    Returns:
+        dict: rows (valid rows imported; skipped ones are in error_count), created, updated,
+              error_count, errors [(row number, message)], seconds and rows_per_second
+
+    Raises:
+        ImportFileError: if the file cannot be read at all
+    """
+    started = time.monotonic()
+    validator = RowValidator()
+    result = {'rows': 0, 'created': 0, 'updated': 0, 'error_count': 0, 'errors': []}
+    # Keyed by name so a repeated name inside one chunk becomes a single upsert row
+    chunk = {}
+
+    def flush():
+        created, updated = _write_chunk(company, chunk, actor)
+        result['created'] += created
+        result['updated'] += updated
+        chunk.clear()
+
+    for row_number, raw in iter_rows(uploaded_file, filename):
+        values, error = validator.clean(raw)
+        if error:
+            result['error_count'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append((row_number, error))
+            continue
+        result['rows'] += 1
+        chunk[values['item_name']] = values
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    autocomplete.invalidate(company.pk)
+    if result['created'] or result['updated']:
+        with transaction.atomic():
+            # The whole import is one feed entry, so it counts as one of today's updates
+            apply_inventory_deltas(company.pk, [], updates=1)
+            record_activity(company.pk, 'products_imported', filename,
+                            f"{result['created']} added, {result['updated']} updated", actor)
+
+    result['seconds'] = time.monotonic() - started
+    result['rows_per_second'] = result['rows'] / result['seconds'] if result['seconds'] else 0
+    return result
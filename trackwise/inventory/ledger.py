@@ -0,0 +1,139 @@
+"""
+Stock movement ledger and point-in-time quantities.
+
+Every change to Product.quantity is also written here as a StockMovement. Daily
+StockSnapshot rows bound how much of the ledger any history query has to read.
+"""
+from datetime import datetime, time
+from django.db.models import Max, Sum
+from django.utils import timezone
+from .models import Product, StockMovement, StockSnapshot
+
+def record_movement(company_id, product_id, delta, reason='adjustment', actor=None):
+    """Append one movement; a zero delta is not recorded."""
+    if delta:
+        StockMovement.objects.create(
+            company_id=company_id, product_id=product_id, delta=delta, reason=reason, actor=actor,
+        )
+
+def record_movements(company_id, deltas, reason='adjustment', actor=None):
+    """Append one movement per product with a single INSERT. `deltas` maps product id -> change."""
+    now = timezone.now()
+    StockMovement.objects.bulk_create([
+        StockMovement(company_id=company_id, product_id=product_id, delta=delta,
+                      reason=reason, actor=actor, created_at=now)
+        for product_id, delta in deltas.items() if delta
+    ])
+
+def _movement_total(product_id, after=None, until=None):
+    movements = StockMovement.objects.filter(product_id=product_id)
+    if after is not None:
+        movements = movements.filter(created_at__gt=after)
+    if until is not None:
+        movements = movements.filter(created_at__lte=until)
+    return movements.aggregate(total=Sum('delta'))['total'] or 0
+
+def _movement_totals(product_ids, after=None, until=None):
+    """Sum of movements per product for many products in one grouped query."""
+    movements = StockMovement.objects.filter(product_id__in=product_ids)
+    if after is not None:
+        movements = movements.filter(created_at__gt=after)
+    if until is not None:
+        movements = movements.filter(created_at__lte=until)
+    return dict(movements.values('product_id').annotate(total=Sum('delta')).values_list('product_id', 'total'))
+
+def quantity_at(product_id, when):
+    """
+    A product's quantity at a past moment.
+
+    Reads the closest snapshot on either side of `when` and only the movements
+    between that snapshot and `when`, so the cost does not depend on ledger size.
+
+    Returns:
+        int or None: the quantity, or None if the product never existed
+    """
+    earlier = (StockSnapshot.objects.filter(product_id=product_id, taken_at__lte=when)
+               .order_by('-taken_at').values_list('taken_at', 'quantity').first())
+    if earlier:
+        taken_at, quantity = earlier
+        return quantity + _movement_total(product_id, after=taken_at, until=when)
+
+    later = (StockSnapshot.objects.filter(product_id=product_id, taken_at__gt=when)
+             .order_by('taken_at').values_list('taken_at', 'quantity').first())
+    if later:
+        taken_at, quantity = later
+        return quantity - _movement_total(product_id, after=when, until=taken_at)
+
+    # No snapshots yet: walk back from the live quantity
+    current = Product.objects.filter(pk=product_id).values_list('quantity', flat=True).first()
+    if current is None:
+        # Deleted: its 'deleted' movement took the ledger back to zero
+        if not StockMovement.objects.filter(product_id=product_id, reason='deleted').exists():
+            return None
+        current = 0
+    return current - _movement_total(product_id, after=when)
+
+def start_of_day(day):
+    """Midnight at the start of `day` in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def take_snapshots(cutoff, batch_size=1000):
+    """
+    Write a StockSnapshot at `cutoff` for every product that lacks one.
+
+    A product's snapshot is its previous snapshot plus the movements since, so
+    snapshots agree with the ledger; products without one are derived from
+    their live quantity minus movements after the cutoff.
+
+    Returns:
+        int: Number of snapshots created
+    """
+    created = 0
+    last_pk = 0
+    while True:
+        products = list(
+            Product.objects.filter(pk__gt=last_pk)
+            .exclude(snapshots__taken_at=cutoff)
+            .order_by('pk')
+            .values_list('pk', 'company_id', 'quantity')[:batch_size]
+        )
+        if not products:
+            return created
+        last_pk = products[-1][0]
+        ids = [pk for pk, _, _ in products]
+
+        # Latest earlier snapshot of each product in this batch
+        latest = dict(
+            StockSnapshot.objects.filter(product_id__in=ids, taken_at__lt=cutoff)
+            .values('product_id').annotate(latest=Max('taken_at'))
+            .values_list('product_id', 'latest')
+        )
+        previous = {
+            product_id: quantity
+            for product_id, taken_at, quantity in StockSnapshot.objects.filter(
+                product_id__in=latest, taken_at__in=set(latest.values())
+            ).values_list('product_id', 'taken_at', 'quantity')
+            if latest[product_id] == taken_at
+        }
+
+        # Movement totals, one grouped query per distinct starting point (normally just yesterday's snapshot)
+        starts = {}
+        for product_id, taken_at in latest.items():
+            starts.setdefault(taken_at, []).append(product_id)
+        movement_totals = {}
+        for taken_at, product_ids in starts.items():
+            movement_totals.update(_movement_totals(product_ids, after=taken_at, until=cutoff))
+        unsnapshotted = [pk for pk in ids if pk not in previous]
+        later_totals = _movement_totals(unsnapshotted, after=cutoff) if unsnapshotted else {}
+
+        snapshots = []
+        for product_id, company_id, live_quantity in products:
+            if product_id in previous:
+                quantity = previous[product_id] + movement_totals.get(product_id, 0)
+            else:
+                quantity = live_quantity - later_totals.get(product_id, 0)
+            snapshots.append(StockSnapshot(
+                product_id=product_id, company_id=company_id, taken_at=cutoff, quantity=quantity,
+            ))
+        StockSnapshot.objects.bulk_create(snapshots, ignore_conflicts=True)
+        created += len(snapshots)
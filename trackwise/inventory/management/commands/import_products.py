@@ -0,0 +1,40 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import Company
+from inventory.importer import import_products, ImportFileError, IMPORT_CHUNK_SIZE
+
+class Command(BaseCommand):
+    help = 'Create or update a company\'s products from a CSV or XLSX file (same rules as the import page)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file to import')
+        parser.add_argument('--company', type=int, required=True, help='Company id that receives the products')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                            help=f'Rows written per transaction (default: {IMPORT_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        try:
+            company = Company.objects.get(pk=options['company'])
+        except Company.DoesNotExist:
+            raise CommandError(f"Company {options['company']} does not exist")
+
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_products(company, f, os.path.basename(options['path']),
+                                         chunk_size=options['chunk_size'])
+        except OSError as e:
+            raise CommandError(str(e))
+        except ImportFileError as e:
+            raise CommandError(str(e))
+
+        for row_number, error in result['errors']:
+            self.stderr.write(f"  row {row_number}: {error}")
+        if result['error_count'] > len(result['errors']):
+            self.stderr.write(f"  ... and {result['error_count'] - len(result['errors'])} more")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{company.name}: {result['rows']} rows imported, {result['created']} created, {result['updated']} updated, "
+            f"{result['error_count']} skipped in {result['seconds']:.1f}s ({result['rows_per_second']:.0f} rows/s)"
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from inventory.search import get_search_backend
+
+class Command(BaseCommand):
+    help = 'Refill the product search index from the products table (SQLite FTS5 only; PostgreSQL indexes maintain themselves)'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{type(backend).__name__}: indexed {indexed} products"))
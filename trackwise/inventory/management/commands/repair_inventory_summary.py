@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from accounts.models import Company
+from inventory.models import CompanyInventorySummary, Product
+from inventory.services import inventory_stats, rebuild_inventory_summary
+
+# summary field -> inventory_stats() key
+SUMMARY_FIELDS = {
+    'product_count': 'total_products',
+    'total_quantity': 'total_quantity',
+    'total_value': 'total_inventory_value',
+    'low_stock_count': 'low_stock_count',
+    'out_of_stock_count': 'out_of_stock_count',
+}
+
+class Command(BaseCommand):
+    help = 'Recompute CompanyInventorySummary rows from products and report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='Only check this company id')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        companies = Company.objects.order_by('pk')
+        if options['company']:
+            companies = companies.filter(pk=options['company'])
+
+        summaries = {s.company_id: s for s in CompanyInventorySummary.objects.filter(company__in=companies)}
+        drifted = 0
+
+        for company in companies.only('id', 'name'):
+            actual = inventory_stats(Product.objects.filter(company=company))
+            summary = summaries.get(company.pk)
+
+            if summary is None:
+                differences = ['missing summary row']
+            else:
+                differences = [
+                    f"{field}: {getattr(summary, field)} -> {actual[key]}"
+                    for field, key in SUMMARY_FIELDS.items()
+                    if getattr(summary, field) != actual[key]
+                ]
+
+            if not differences:
+                continue
+
+            drifted += 1
+            self.stdout.write(self.style.WARNING(f"{company.name} (id {company.pk}): " + ', '.join(differences)))
+            if not options['dry_run']:
+                rebuild_inventory_summary(company.pk)
+
+        verb = 'found' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f"Checked {companies.count()} companies, {verb} {drifted} with drift"))
@@ -0,0 +1,28 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from inventory.ledger import start_of_day, take_snapshots
+
+class Command(BaseCommand):
+    help = 'Write the daily StockSnapshot for every product (run once a day, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Snapshot as of the start of this day, YYYY-MM-DD (default: today)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Products read and inserted per batch (default: 1000)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        if options['date']:
+            try:
+                day = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+        else:
+            day = timezone.localdate()
+
+        cutoff = start_of_day(day)
+        created = take_snapshots(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {created} stock snapshots as of {cutoff:%Y-%m-%d %H:%M %Z}"))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_imageblob_userprofile_profile_picture_blob'),
+        ('inventory', '0003_product_image_content_type_product_image_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.imageblob'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_migrationcheckpoint'),
+        ('inventory', '0004_product_image_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyInventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_count', models.IntegerField(default=0)),
+                ('total_quantity', models.BigIntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('low_stock_count', models.IntegerField(default=0)),
+                ('out_of_stock_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summary', to='accounts.company')),
+            ],
+            options={
+                'verbose_name_plural': 'Company inventory summaries',
+            },
+        ),
+    ]
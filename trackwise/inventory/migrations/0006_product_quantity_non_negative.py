@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+def clamp_negative_quantities(apps, schema_editor):
+    """Existing negative stock would violate the new constraint; treat it as out of stock."""
+    Product = apps.get_model('inventory', 'Product')
+    CompanyInventorySummary = apps.get_model('inventory', 'CompanyInventorySummary')
+    negative = Product.objects.filter(quantity__lt=0)
+    company_ids = set(negative.values_list('company_id', flat=True))
+    if company_ids:
+        negative.update(quantity=0)
+        # Summaries are rebuilt from the products on next use
+        CompanyInventorySummary.objects.filter(company_id__in=company_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_migrationcheckpoint'),
+        ('inventory', '0005_companyinventorysummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(clamp_negative_quantities, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.CheckConstraint(condition=models.Q(('quantity__gte', 0)), name='product_quantity_non_negative', violation_error_message='Quantity cannot be negative.'),
+        ),
+    ]
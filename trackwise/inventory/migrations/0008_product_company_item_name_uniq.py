@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:48
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_names(apps, schema_editor):
+    """Keep the oldest product's name; later duplicates get their id appended so nothing is lost."""
+    Product = apps.get_model('inventory', 'Product')
+    duplicates = (Product.objects.values('company_id', 'item_name')
+                  .annotate(n=Count('id')).filter(n__gt=1))
+    for group in duplicates:
+        rows = (Product.objects.filter(company_id=group['company_id'], item_name=group['item_name'])
+                .order_by('pk').values_list('pk', flat=True))
+        for pk in list(rows)[1:]:
+            suffix = f" (#{pk})"
+            Product.objects.filter(pk=pk).update(item_name=group['item_name'][:200 - len(suffix)] + suffix)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_migrationcheckpoint'),
+        ('inventory', '0007_stockmovement_stocksnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_names, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('company', 'item_name'), name='product_company_item_name_uniq', violation_error_message='A product with this name already exists.'),
+        ),
+    ]
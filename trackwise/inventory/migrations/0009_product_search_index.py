@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:05
+
+from django.db import migrations
+
+# Must match inventory.search.PG_SEARCH_DOCUMENT_SQL for the planner to use the index
+PG_SEARCH_DOCUMENT = (
+    "(setweight(to_tsvector('simple'::regconfig, coalesce(item_name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(category, '')), 'B'))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS product_search_document_gin ON inventory_product USING gin ({PG_SEARCH_DOCUMENT})"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS product_item_name_trgm ON inventory_product USING gin (item_name gin_trgm_ops)"
+        )
+    elif vendor == 'sqlite':
+        from django.db import OperationalError
+        try:
+            # prefix='2 3' keeps short search-as-you-type prefixes fast
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_product_fts USING fts5("
+                "item_name, category, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except OperationalError:
+            # SQLite without FTS5; search falls back to icontains
+            return
+        schema_editor.execute(
+            "INSERT INTO inventory_product_fts (rowid, item_name, category) "
+            "SELECT id, item_name, category FROM inventory_product"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS product_item_name_trgm")
+        schema_editor.execute("DROP INDEX IF EXISTS product_search_document_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS inventory_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_product_company_item_name_uniq'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
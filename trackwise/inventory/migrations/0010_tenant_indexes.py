@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:55
+
+from django.db import migrations, models
+from accounts.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0012_tenant_indexes'),
+        ('inventory', '0009_product_search_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['company', 'cost_price', 'id'], name='product_company_cost_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['company', '-created_at'], name='product_company_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['company', '-updated_at'], name='product_company_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('quantity__gt', 0), ('quantity__lte', 10)), fields=['company', 'item_name'], name='product_low_stock_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('quantity', 0)), fields=['company', 'item_name'], name='product_out_of_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:57
+
+import django.db.models.expressions
+from django.db import migrations, models
+from accounts.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0012_tenant_indexes'),
+        ('inventory', '0010_tenant_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_low_stock_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_out_of_stock_idx',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='stock_status',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('quantity', 0)), then=models.Value('out_of_stock')), models.When(models.Q(('quantity__gt', 0), ('quantity__lte', 10)), then=models.Value('low_stock')), default=models.Value('in_stock')), output_field=models.CharField(choices=[('in_stock', 'In Stock'), ('low_stock', 'Low Stock'), ('out_of_stock', 'Out of Stock')], max_length=12)),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='total_value',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', models.F('cost_price')), output_field=models.DecimalField(decimal_places=2, max_digits=20)),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['company', 'stock_status', 'item_name'], name='product_company_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['company', '-total_value', '-id'], name='product_company_value_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:59
+
+from django.db import migrations, models
+from accounts.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0013_company_low_stock_threshold'),
+        ('inventory', '0011_product_generated_status_value'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(default=10, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_point',
+            field=models.PositiveIntegerField(blank=True, help_text='Low-stock level for this product; leave empty to use the company default', null=True),
+        ),
+        # Generated columns cannot be altered in place: drop the old status (and its index) and add it back
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_company_status_idx',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='stock_status',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='stock_status',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('quantity', 0)), then=models.Value('out_of_stock')), models.When(models.Q(('quantity__gt', 0), ('quantity__lte', models.F('low_stock_threshold'))), then=models.Value('low_stock')), default=models.Value('in_stock')), output_field=models.CharField(choices=[('in_stock', 'In Stock'), ('low_stock', 'Low Stock'), ('out_of_stock', 'Out of Stock')], max_length=12)),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['company', 'stock_status', 'item_name'], name='product_company_status_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_product_reorder_point'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyinventorysummary',
+            name='updates_today',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='companyinventorysummary',
+            name='updates_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
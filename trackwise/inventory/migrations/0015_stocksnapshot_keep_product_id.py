@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_stockmovement_keep_product_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stocksnapshot',
+            name='product',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='snapshots', to='inventory.product'),
+        ),
+    ]
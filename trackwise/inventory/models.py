@@ -1,8 +1,36 @@
 from django.db import models
 from django.urls import reverse
-from accounts.models import Company
+from django.utils import timezone
+from accounts.managers import HeavyFieldsManager
+from accounts.models import Company, ImageBlob
 import base64
 
+# Default low-stock threshold for products whose company has not chosen one
+LOW_STOCK_THRESHOLD = 10
+
+# Row predicates behind Product.stock_status; each product carries its own effective threshold
+LOW_STOCK_Q = models.Q(quantity__gt=0, quantity__lte=models.F('low_stock_threshold'))
+OUT_OF_STOCK_Q = models.Q(quantity=0)
+
+# Annotate list querysets with this as `has_legacy_image` so image URLs need neither the base64 column nor a query
+HAS_LEGACY_IMAGE = models.ExpressionWrapper(
+    models.Q(image__isnull=False) & ~models.Q(image=''), output_field=models.BooleanField()
+)
+
+STOCK_STATUS_CHOICES = [
+    ('in_stock', 'In Stock'),
+    ('low_stock', 'Low Stock'),
+    ('out_of_stock', 'Out of Stock'),
+]
+
+def stock_status_for(quantity, low_stock_threshold=LOW_STOCK_THRESHOLD):
+    """Python twin of the stock_status column, for values not read from the database."""
+    if quantity == 0:
+        return 'out_of_stock'
+    if quantity <= low_stock_threshold:
+        return 'low_stock'
+    return 'in_stock'
+
 class Product(models.Model):
     CATEGORY_CHOICES = [
         ('electronics', 'Electronics'),
@@ -31,30 +59,94 @@ class Product(models.Model):
         ('bags', 'Bags'),
     ]
     
+    LOW_STOCK_THRESHOLD = LOW_STOCK_THRESHOLD
+    STOCK_STATUS_CHOICES = STOCK_STATUS_CHOICES
+    
     item_name = models.CharField(max_length=200)
     
-    # Store base64 encoded image as TextField
+    # Legacy base64 image, kept readable until rows are migrated to ImageBlob
     image = models.TextField(null=True, blank=True)
     image_content_type = models.CharField(max_length=50, null=True, blank=True)
     image_name = models.CharField(max_length=255, null=True, blank=True)
+    # Deduplicated raw image bytes, referenced by id so list queries stay small
+    image_blob = models.ForeignKey(ImageBlob, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='other')
     quantity = models.IntegerField(default=0)
     unit_of_measure = models.CharField(max_length=20, choices=UNIT_CHOICES, default='pieces')
     cost_price = models.DecimalField(max_digits=10, decimal_places=2)
+    reorder_point = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text="Low-stock level for this product; leave empty to use the company default"
+    )
+    # Effective threshold: reorder_point, or the company's low_stock_threshold when that is empty.
+    # Kept on the row so stock_status can be computed and indexed without a join.
+    low_stock_threshold = models.PositiveIntegerField(default=LOW_STOCK_THRESHOLD, editable=False)
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Computed and stored by the database on every write, so they can be filtered, counted and sorted
+    # through indexes. Values on an instance are stale after save() until it is reloaded.
+    total_value = models.GeneratedField(
+        expression=models.F('quantity') * models.F('cost_price'),
+        output_field=models.DecimalField(max_digits=20, decimal_places=2),
+        db_persist=True,
+    )
+    stock_status = models.GeneratedField(
+        expression=models.Case(
+            models.When(OUT_OF_STOCK_Q, then=models.Value('out_of_stock')),
+            models.When(LOW_STOCK_Q, then=models.Value('low_stock')),
+            default=models.Value('in_stock'),
+        ),
+        output_field=models.CharField(max_length=12, choices=STOCK_STATUS_CHOICES),
+        db_persist=True,
+    )
+    
+    # The legacy base64 image is read only by the image endpoint; see accounts.managers
+    HEAVY_FIELDS = ('image',)
+    objects = HeavyFieldsManager()
+    
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(quantity__gte=0),
+                name='product_quantity_non_negative',
+                violation_error_message='Quantity cannot be negative.',
+            ),
+            # Item names identify products within a company, e.g. for bulk imports
+            models.UniqueConstraint(
+                fields=['company', 'item_name'],
+                name='product_company_item_name_uniq',
+                violation_error_message='A product with this name already exists.',
+            ),
+        ]
+        # Every list starts with company=...; (company, item_name) is already covered by the unique constraint
+        indexes = [
+            models.Index(fields=['company', 'cost_price', 'id'], name='product_company_cost_idx'),
+            models.Index(fields=['company', '-created_at'], name='product_company_created_idx'),
+            models.Index(fields=['company', '-updated_at'], name='product_company_updated_idx'),
+            # Low/out-of-stock lists and counts; replaces the earlier partial indexes on the same predicates
+            models.Index(fields=['company', 'stock_status', 'item_name'], name='product_company_status_idx'),
+            models.Index(fields=['company', '-total_value', '-id'], name='product_company_value_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.item_name} ({self.company.name})"
     
     def get_absolute_url(self):
         return reverse('product_detail', kwargs={'pk': self.pk})
     
-    @property
-    def total_value(self):
-        return self.quantity * self.cost_price
+    def save(self, *args, **kwargs):
+        if self.reorder_point is not None:
+            self.low_stock_threshold = self.reorder_point
+        elif self.company_id:
+            self.low_stock_threshold = self.company.low_stock_threshold
+        super().save(*args, **kwargs)
+    
+    def get_stock_status_display(self):
+        # The choices sit on the generated column's output field, so Django does not add this itself
+        return dict(STOCK_STATUS_CHOICES).get(self.stock_status, '')
     
     def get_display_quantity(self):
         return f"{self.quantity} {self.unit_of_measure}"
@@ -83,6 +175,8 @@ class Product(models.Model):
     @property
     def image_base64(self):
         """Get image as base64 data URL for HTML display."""
+        if self.image_blob_id:
+            return self.image_blob.as_data_url()
         if self.image:
             try:
                 # Remove any existing data URL prefix if present
@@ -99,22 +193,152 @@ class Product(models.Model):
                 return None
         return None
     
+    def image_url_for(self, width=None):
+        """
+        URL of the image endpoint; blob-backed URLs carry the blob id so they can be cached forever.
+        `width` asks for the smallest generated variant that covers that many pixels.
+        """
+        url = reverse('inventory:product_image', kwargs={'pk': self.pk})
+        if self.image_blob_id:
+            url = f"{url}?v={self.image_blob_id}"
+            return f"{url}&w={width}" if width else url
+        if self._has_legacy_image():
+            return url
+        return None
+    
+    def _has_legacy_image(self):
+        """Whether the image still lives in the legacy base64 column, without loading that column."""
+        if 'has_legacy_image' in self.__dict__:
+            return self.has_legacy_image
+        if 'image' not in self.get_deferred_fields():
+            return bool(self.image)
+        # Legacy uploads always stored their content type next to the base64 text
+        return bool(self.image_content_type)
+    
+    @property
+    def image_url(self):
+        return self.image_url_for()
+    
+    @property
+    def image_thumbnail_url(self):
+        """Image sized for table rows and dashboard cards."""
+        return self.image_url_for(64)
+    
+    @property
+    def image_preview_url(self):
+        """Image sized for the product detail page."""
+        return self.image_url_for(256)
+    
     def set_image_from_file(self, uploaded_file):
         """Set image from uploaded file."""
         if uploaded_file:
             try:
-                # Read file content
-                file_content = uploaded_file.read()
+                # Store raw bytes in the shared blob table
+                blob = ImageBlob.store_file(uploaded_file)
                 
-                # Encode to base64
-                encoded = base64.b64encode(file_content).decode('utf-8')
-                
-                # Store in image field
-                self.image = encoded
-                self.image_content_type = uploaded_file.content_type
+                self.image_blob = blob
+                self.image_content_type = blob.content_type
                 self.image_name = uploaded_file.name
+                # Drop the legacy base64 copy so the row stays small
+                self.image = None
                 return True
             except Exception as e:
                 print(f"Error setting image: {e}")
                 return False
-        return False
\ No newline at end of file
+        return False
+
+class CompanyInventorySummary(models.Model):
+    """
+    Running inventory totals for one company.
+    
+    Kept current by inventory.services.apply_inventory_delta from every path that
+    adds, edits, deletes or restocks a product, so reading the totals is a single-row lookup.
+    `repair_inventory_summary` recomputes it from the products if it ever drifts.
+    """
+    company = models.OneToOneField(Company, on_delete=models.CASCADE, related_name='inventory_summary')
+    product_count = models.IntegerField(default=0)
+    total_quantity = models.BigIntegerField(default=0)
+    total_value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    low_stock_count = models.IntegerField(default=0)
+    out_of_stock_count = models.IntegerField(default=0)
+    # Product entries in the activity feed (inventory.services.PRODUCT_UPDATE_KINDS) during the
+    # company-local day that ends at updates_until; the first write after that instant restarts
+    # the count, so reading it never needs a query
+    updates_today = models.IntegerField(default=0)
+    updates_until = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Company inventory summaries'
+    
+    def __str__(self):
+        return f"Inventory summary for {self.company.name}"
+    
+    def as_stats(self):
+        """Same shape as inventory.services.inventory_stats(), plus updates_today."""
+        return {
+            'total_products': self.product_count,
+            'total_quantity': self.total_quantity,
+            'total_inventory_value': self.total_value,
+            'low_stock_count': self.low_stock_count,
+            'out_of_stock_count': self.out_of_stock_count,
+            'updates_today': self.updates_today if self.updates_until and self.updates_until > timezone.now() else 0,
+        }
+
+
+class StockMovement(models.Model):
+    """
+    Append-only record of one change to a product's quantity.
+    
+    Rows are never updated; the history of a product is its movements in created_at order.
+    """
+    REASON_CHOICES = [
+        ('created', 'Product Added'),
+        ('edited', 'Product Edited'),
+        ('adjustment', 'Stock Adjustment'),
+        ('deleted', 'Product Deleted'),
+        ('import', 'Bulk Import'),
+    ]
+    
+    # No database constraint and no cascade: product_id survives the product's deletion, so its history
+    # (including the 'deleted' movement) can still be read by id. `movement.product` raises once it is gone.
+    product = models.ForeignKey(
+        Product, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='movements'
+    )
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='stock_movements')
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES, default='adjustment')
+    actor = models.ForeignKey('accounts.UserProfile', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'created_at'], name='stockmove_company_created_idx'),
+            models.Index(fields=['product', 'created_at'], name='stockmove_product_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.delta:+d} ({self.get_reason_display()}) at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class StockSnapshot(models.Model):
+    """
+    A product's quantity as of `taken_at`, written daily by the snapshot_stock command.
+    
+    Any past quantity is the nearest snapshot plus the movements between it and that moment.
+    """
+    # Kept after the product is deleted, like StockMovement.product, so quantity_at still has a starting point
+    product = models.ForeignKey(
+        Product, on_delete=models.DO_NOTHING, db_constraint=False, related_name='snapshots'
+    )
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='+')
+    taken_at = models.DateTimeField()
+    quantity = models.IntegerField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'taken_at'], name='stocksnapshot_product_taken_at_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} = {self.quantity} at {self.taken_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,94 @@
+"""
+Keyset (cursor) pagination for the inventory list.
+
+Each page continues strictly after the last row of the previous one, using the
+same (sort value, id) pair the list is ordered by. Unlike OFFSET paging, the
+cost of fetching a page does not grow with how deep into the catalogue it is.
+"""
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+from django.db.models import Q, Value
+from .search import rank_expression
+
+INVENTORY_PAGE_SIZE = 50
+
+# cost_filter value -> (sort field, descending)
+INVENTORY_ORDERINGS = {
+    '': ('item_name', False),
+    'low': ('cost_price', False),
+    'high': ('cost_price', True),
+    'value': ('total_value', True),
+    # Searches without an explicit sort; search_rank is annotated by inventory.search
+    'relevance': ('search_rank', True),
+}
+
+def get_ordering(cost_filter):
+    return INVENTORY_ORDERINGS.get(cost_filter, INVENTORY_ORDERINGS[''])
+
+def encode_cursor(product, cost_filter):
+    """Build the opaque cursor pointing just after `product`."""
+    field, _ = get_ordering(cost_filter)
+    value = getattr(product, field)
+    # repr() of a float reads back as the identical double
+    payload = json.dumps([repr(value) if field == 'search_rank' else str(value), product.pk])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token, cost_filter):
+    """
+    Parse a cursor made by encode_cursor.
+
+    Returns:
+        tuple: (sort value, id), or None if the token is missing or malformed
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        field, _ = get_ordering(cost_filter)
+        if field in ('cost_price', 'total_value'):
+            value = Decimal(value)
+        elif field == 'search_rank':
+            value = float(value)
+        return value, int(pk)
+    except (binascii.Error, ValueError, TypeError, InvalidOperation, UnicodeError):
+        return None
+
+def keyset_page(queryset, cost_filter, cursor=None, page_size=INVENTORY_PAGE_SIZE):
+    """
+    Return one page of `queryset` in list order.
+
+    Args:
+        queryset: Already filtered Product queryset
+        cost_filter: The list's sort option ('', 'low', 'high', 'value' or 'relevance')
+        cursor: Token from a previous page, or None for the first page
+        page_size: Number of rows per page
+
+    Returns:
+        tuple: (list of products, cursor for the next page or None)
+    """
+    field, descending = get_ordering(cost_filter)
+    if descending:
+        queryset = queryset.order_by(f'-{field}', '-id')
+    else:
+        queryset = queryset.order_by(field, 'id')
+
+    position = decode_cursor(cursor, cost_filter)
+    if position:
+        value, pk = position
+        if field == 'search_rank':
+            # Same type as the annotation, so rows tied on rank compare equal
+            value = rank_expression(Value(value))
+        if descending:
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+        else:
+            queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+
+    # One extra row tells us whether another page exists without a COUNT
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1], cost_filter)
+    return rows, None
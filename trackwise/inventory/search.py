@@ -0,0 +1,180 @@
+"""
+Ranked product search for the inventory list.
+
+The backend is picked from the database vendor:
+- PostgreSQL: a weighted tsvector (GIN expression index) with prefix matching,
+  plus pg_trgm word similarity on item names so typos still match.
+- SQLite: an FTS5 shadow table, kept in sync by the Product signals and by
+  bulk writers calling index_products().
+- Anything else: the old icontains filter.
+
+Every backend filters a Product queryset and annotates it with `search_rank`
+(higher is more relevant), which the list uses as its sort key. The rank is
+cast to double precision (rank_expression) so a keyset cursor holding a Python
+float compares exactly against it; PostgreSQL's ts_rank is a real, and a real
+compared with a double literal can skip or repeat rows tied on rank.
+"""
+import re
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+# Search terms are reduced to word characters so user input never reaches a query parser as syntax
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# Must stay identical to the indexed expression in migration 0009_product_search_index
+PG_SEARCH_DOCUMENT_SQL = (
+    "(setweight(to_tsvector('simple'::regconfig, coalesce(\"inventory_product\".\"item_name\", '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(\"inventory_product\".\"category\", '')), 'B'))"
+)
+
+SQLITE_FTS_TABLE = 'inventory_product_fts'
+
+def search_terms(query):
+    return _WORD_RE.findall(query.lower())
+
+def rank_expression(expression):
+    """`expression` as the double precision value stored in `search_rank` and in pagination cursors."""
+    return Cast(expression, output_field=FloatField())
+
+class ContainsSearchBackend:
+    """Plain substring matching, for databases without a dedicated backend."""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(item_name__icontains=query) | Q(category__icontains=query)
+        ).annotate(search_rank=rank_expression(Value(1.0)))
+
+    def index_products(self, product_ids):
+        pass
+
+    def remove_products(self, product_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+class PostgresSearchBackend(ContainsSearchBackend):
+    """Full-text prefix search with trigram fallback for misspelt item names."""
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramWordSimilarity
+        from django.db.models import BooleanField
+
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        # "red shi" -> red:* & shi:*, so results appear while the user is still typing
+        tsquery = SearchQuery(' & '.join(f'{term}:*' for term in terms), config='simple', search_type='raw')
+        document = RawSQL(PG_SEARCH_DOCUMENT_SQL, (), output_field=SearchVectorField())
+        # `<%` is pg_trgm's word-similarity operator, served by the trigram index on item_name
+        similar_name = RawSQL('%s <%% "inventory_product"."item_name"', (query,), output_field=BooleanField())
+
+        return queryset.alias(search_document=document).filter(
+            Q(search_document=tsquery) | Q(similar_name)
+        ).annotate(
+            search_rank=rank_expression(SearchRank(document, tsquery) + TrigramWordSimilarity(query, 'item_name')),
+        )
+
+class SqliteSearchBackend(ContainsSearchBackend):
+    """FTS5 prefix search ranked with bm25; item names weigh more than categories."""
+
+    _available = None
+
+    def is_available(self):
+        if self._available is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SQLITE_FTS_TABLE])
+                SqliteSearchBackend._available = cursor.fetchone() is not None
+        return self._available
+
+    def search(self, queryset, query):
+        if not self.is_available():
+            # SQLite built without FTS5
+            return super().search(queryset, query)
+
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s", (match,))
+        ).annotate(search_rank=rank_expression(RawSQL(
+            # bm25() is lower for better matches; flip it so that higher is better like the other backends
+            f"SELECT -bm25({SQLITE_FTS_TABLE}, 10.0, 1.0) FROM {SQLITE_FTS_TABLE} "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid = \"inventory_product\".\"id\"",
+            (match,),
+            output_field=FloatField(),
+        )))
+
+    def index_products(self, product_ids):
+        """Copy the current name and category of these products into the search table."""
+        if not product_ids or not self.is_available():
+            return
+        product_ids = list(product_ids)
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(product_ids), 500):
+            chunk = product_ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT OR REPLACE INTO {SQLITE_FTS_TABLE} (rowid, item_name, category) "
+                    f"SELECT id, item_name, category FROM inventory_product WHERE id IN ({placeholders})",
+                    chunk,
+                )
+
+    def remove_products(self, product_ids):
+        if not product_ids or not self.is_available():
+            return
+        product_ids = list(product_ids)
+        for start in range(0, len(product_ids), 500):
+            chunk = product_ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+    def rebuild(self):
+        """Refill the search table from inventory_product; returns the number of rows indexed."""
+        if not self.is_available():
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, item_name, category) "
+                f"SELECT id, item_name, category FROM inventory_product"
+            )
+            return cursor.rowcount
+
+_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SqliteSearchBackend,
+}
+
+_backend = None
+
+def get_search_backend():
+    """The search backend for the default database."""
+    global _backend
+    if _backend is None:
+        _backend = _BACKENDS.get(connection.vendor, ContainsSearchBackend)()
+    return _backend
+
+def search_products(queryset, query):
+    """
+    Narrow a Product queryset to the products matching `query`.
+
+    Args:
+        queryset: Product queryset, usually already filtered to one company
+        query: Text from the search box
+
+    Returns:
+        QuerySet: matching products annotated with `search_rank` (higher is more relevant)
+    """
+    return get_search_backend().search(queryset, query)
+
+def index_products(product_ids):
+    """Refresh the search entries of products written without model signals (bulk_create, update)."""
+    get_search_backend().index_products(product_ids)
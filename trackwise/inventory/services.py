@@ -0,0 +1,298 @@
+"""
+Inventory statistics computed in the database.
+
+Every page that shows inventory totals goes through here. Company-wide totals
+are read from the maintained CompanyInventorySummary row; filtered subsets
+(e.g. a search) fall back to a single aggregate query.
+"""
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+from accounts.data_version import bump_data_version
+from accounts.models import Company
+from dashboard.activity import activity_event, record_activities, record_activity
+from dashboard.models import ActivityEvent
+from .ledger import record_movement, record_movements
+from .models import Product, CompanyInventorySummary, stock_status_for
+
+def inventory_stats(products):
+    """
+    Aggregate a Product queryset in one query.
+    
+    Args:
+        products: Product queryset, usually already filtered to one company
+    
+    Returns:
+        dict: total_products, total_quantity, total_inventory_value (Decimal),
+              low_stock_count and out_of_stock_count
+    """
+    stats = products.order_by().aggregate(
+        total_products=Count('id'),
+        total_quantity=Sum('quantity'),
+        total_inventory_value=Sum('total_value'),
+        low_stock_count=Count('id', filter=Q(stock_status='low_stock')),
+        out_of_stock_count=Count('id', filter=Q(stock_status='out_of_stock')),
+    )
+    stats['total_quantity'] = stats['total_quantity'] or 0
+    stats['total_inventory_value'] = stats['total_inventory_value'] or Decimal('0')
+    return stats
+
+def company_inventory_stats(company):
+    """Inventory statistics for every product of a company, computed from the products."""
+    return inventory_stats(Product.objects.filter(company=company))
+
+def low_stock_products(company):
+    """A company's low-stock products by name, read from the product_company_status_idx index."""
+    return Product.objects.filter(company=company, stock_status='low_stock').order_by('item_name')
+
+def out_of_stock_products(company):
+    """A company's out-of-stock products by name, read from the product_company_status_idx index."""
+    return Product.objects.filter(company=company, stock_status='out_of_stock').order_by('item_name')
+
+def product_state(product):
+    """The fields of a product that feed the company summary, as passed to apply_inventory_delta."""
+    return (product.quantity, product.cost_price, product.low_stock_threshold)
+
+def _summary_contribution(state):
+    if state is None:
+        return {'product_count': 0, 'total_quantity': 0, 'total_value': Decimal('0'),
+                'low_stock_count': 0, 'out_of_stock_count': 0}
+    quantity, cost_price, low_stock_threshold = state
+    status = stock_status_for(quantity, low_stock_threshold)
+    return {
+        'product_count': 1,
+        'total_quantity': quantity,
+        'total_value': quantity * Decimal(cost_price),
+        'low_stock_count': int(status == 'low_stock'),
+        'out_of_stock_count': int(status == 'out_of_stock'),
+    }
+
+def apply_inventory_delta(company_id, before=None, after=None, updates=0):
+    """
+    Shift a company's summary by the difference between two states of one product.
+    
+    Call inside the transaction that saved or deleted the product, after the write:
+    if the company has no summary yet, it is rebuilt from the products as they now are.
+    
+    Args:
+        company_id: Company the product belongs to
+        before: product_state() before the change, or None for a new product
+        after: product_state() after the change, or None for a deleted product
+        updates: Product activity events the caller records for the change (see updates_today)
+    """
+    apply_inventory_deltas(company_id, [(before, after)], updates)
+
+# StockMovement reason -> ActivityEvent kind for whole-product changes
+PRODUCT_ACTIVITY_KINDS = {
+    'created': 'product_added',
+    'edited': 'product_edited',
+    'deleted': 'product_deleted',
+}
+
+# The feed entries counted by CompanyInventorySummary.updates_today, incrementally and on rebuild alike
+PRODUCT_UPDATE_KINDS = (*PRODUCT_ACTIVITY_KINDS.values(), 'stock_adjusted', 'products_imported')
+
+def _quantity_detail(before, after):
+    if before and after and before[0] != after[0]:
+        return f"Quantity {before[0]} -> {after[0]}"
+    if after and not before:
+        return f"Quantity {after[0]}"
+    return ''
+
+def record_product_change(company_id, product_id, before=None, after=None, reason='edited', actor=None, item_name=''):
+    """
+    Apply a product change to the company summary, the stock ledger and the activity feed.
+    
+    Takes the same before/after states as apply_inventory_delta; a quantity
+    difference is also appended as a StockMovement. The activity event is only
+    written when `item_name` is given.
+    """
+    recorded = bool(item_name) and reason in PRODUCT_ACTIVITY_KINDS
+    apply_inventory_delta(company_id, before, after, updates=int(recorded))
+    delta = (after[0] if after else 0) - (before[0] if before else 0)
+    record_movement(company_id, product_id, delta, reason=reason, actor=actor)
+    if recorded:
+        record_activity(company_id, PRODUCT_ACTIVITY_KINDS[reason], item_name, _quantity_detail(before, after), actor)
+
+def apply_inventory_deltas(company_id, changes, updates=0):
+    """
+    Like apply_inventory_delta for many (before, after) pairs, using one UPDATE.
+    
+    `updates` is the number of PRODUCT_UPDATE_KINDS activity events the caller
+    records for these changes; it is added to today's counter, so the counter
+    always equals what rebuild_inventory_summary would count.
+    """
+    totals = {}
+    for before, after in changes:
+        old = _summary_contribution(before)
+        new = _summary_contribution(after)
+        for field in new:
+            totals[field] = totals.get(field, 0) + (new[field] - old[field])
+    changed = {field: F(field) + value for field, value in totals.items() if value}
+    if not changed and not updates:
+        return
+    now = timezone.now()
+    summaries = CompanyInventorySummary.objects.filter(company_id=company_id)
+    # Usual case: still inside the local day the counter covers, no need to know the time zone
+    updated = summaries.filter(updates_until__gt=now).update(
+        updated_at=now, updates_today=F('updates_today') + updates, **changed
+    )
+    if not updated:
+        # First write of a new local day: restart the counter. The CASE keeps a count
+        # that a concurrent writer has already restarted.
+        _, day_end = Company.objects.get(pk=company_id).day_range()
+        updated = summaries.update(
+            updated_at=now,
+            updates_today=Case(
+                When(updates_until__gt=now, then=F('updates_today') + updates),
+                default=Value(updates),
+            ),
+            updates_until=day_end,
+            **changed
+        )
+    if not updated:
+        # First change for this company: the rebuild already includes the saved products, but this
+        # change's activity events are only inserted on commit, so count them on top
+        rebuild_inventory_summary(company_id)
+        if updates:
+            summaries.update(updates_today=F('updates_today') + updates)
+
+def rebuild_inventory_summary(company_id):
+    """
+    Recompute a company's summary from its products and store it.
+    
+    updates_today restarts as the number of product entries in the activity feed
+    since local midnight, read as a half-open range on activity_company_created_idx.
+    """
+    stats = inventory_stats(Product.objects.filter(company_id=company_id))
+    day_start, day_end = Company.objects.get(pk=company_id).day_range()
+    updates_today = ActivityEvent.objects.filter(
+        company_id=company_id, created_at__gte=day_start, created_at__lt=day_end, kind__in=PRODUCT_UPDATE_KINDS
+    ).count()
+    summary, _ = CompanyInventorySummary.objects.update_or_create(
+        company_id=company_id,
+        defaults={
+            'product_count': stats['total_products'],
+            'total_quantity': stats['total_quantity'],
+            'total_value': stats['total_inventory_value'],
+            'low_stock_count': stats['low_stock_count'],
+            'out_of_stock_count': stats['out_of_stock_count'],
+            'updates_today': updates_today,
+            'updates_until': day_end,
+        },
+    )
+    return summary
+
+def get_inventory_summary(company):
+    """Company-wide inventory statistics from the summary row, building it on first use."""
+    summary = CompanyInventorySummary.objects.filter(company=company).first()
+    if summary is None:
+        summary = rebuild_inventory_summary(company.pk)
+    return summary.as_stats()
+
+def adjust_stock(company, product_id, delta, actor=None):
+    """
+    Add `delta` to a product's quantity with one conditional UPDATE.
+    
+    The WHERE clause refuses changes that would take the quantity below zero, so
+    concurrent clicks can neither lose updates nor oversell. Only the quantity and
+    updated_at columns are written.
+    
+    Returns:
+        dict: applied (bool), quantity (after the change) and cost_price
+    
+    Raises:
+        Product.DoesNotExist: if the product is not in this company
+    """
+    with transaction.atomic():
+        applied = Product.objects.filter(
+            pk=product_id, company=company, quantity__gte=-delta
+        ).update(quantity=F('quantity') + delta, updated_at=timezone.now())
+        # Our UPDATE holds the row lock until commit, so this read sees exactly our result
+        item_name, quantity, cost_price, low_stock_threshold = Product.objects.filter(
+            pk=product_id, company=company
+        ).values_list('item_name', 'quantity', 'cost_price', 'low_stock_threshold').get()
+        if applied:
+            apply_inventory_delta(company.pk, (quantity - delta, cost_price, low_stock_threshold),
+                                  (quantity, cost_price, low_stock_threshold), updates=1)
+            record_movement(company.pk, product_id, delta, reason='adjustment', actor=actor)
+            record_activity(company.pk, 'stock_adjusted', item_name, f"{delta:+d} (now {quantity})", actor)
+            bump_data_version(company.pk)
+    return {'applied': bool(applied), 'quantity': quantity, 'cost_price': cost_price}
+
+# Largest number of products one batch request may adjust
+STOCK_BATCH_LIMIT = 500
+
+def adjust_stock_batch(company, deltas, actor=None):
+    """
+    Apply many quantity changes in one transaction.
+    
+    Rows are locked in primary-key order, written with a single CASE UPDATE and
+    the company summary is shifted once. A quantity never drops below zero; a
+    decrement larger than the stock empties it, as repeated single clicks would.
+    
+    Args:
+        company: Company whose products may be changed; other ids are ignored
+        deltas: dict of product id -> quantity change
+        actor: UserProfile recorded on the ledger entries
+    
+    Returns:
+        dict: product id -> new quantity, for every id that belongs to the company
+    """
+    with transaction.atomic():
+        rows = list(
+            Product.objects.select_for_update()
+            .filter(company=company, pk__in=deltas)
+            .order_by('pk')
+            .values_list('pk', 'item_name', 'quantity', 'cost_price', 'low_stock_threshold')
+        )
+        quantities = {}
+        changed_ids = []
+        whens = []
+        changes = []
+        applied = {}
+        events = []
+        for pk, item_name, quantity, cost_price, low_stock_threshold in rows:
+            new_quantity = max(quantity + deltas[pk], 0)
+            quantities[pk] = new_quantity
+            if new_quantity != quantity:
+                changed_ids.append(pk)
+                whens.append(When(pk=pk, then=Value(new_quantity)))
+                changes.append(((quantity, cost_price, low_stock_threshold),
+                                (new_quantity, cost_price, low_stock_threshold)))
+                applied[pk] = new_quantity - quantity
+                events.append(activity_event(company.pk, 'stock_adjusted', item_name,
+                                             f"{new_quantity - quantity:+d} (now {new_quantity})", actor))
+        if changed_ids:
+            Product.objects.filter(pk__in=changed_ids).update(
+                quantity=Case(*whens, output_field=IntegerField()),
+                updated_at=timezone.now(),
+            )
+            # One feed entry, and so one counted update, per product changed
+            apply_inventory_deltas(company.pk, changes, updates=len(events))
+            # Ledger gets the change actually made, which differs from the request when clamped at zero
+            record_movements(company.pk, applied, reason='adjustment', actor=actor)
+            record_activities(events)
+            bump_data_version(company.pk)
+    return quantities
+
+def apply_company_low_stock_threshold(company):
+    """
+    Copy a company's low_stock_threshold onto its products that have no reorder point.
+    
+    Products keep their own threshold column so that stock_status stays a stored,
+    indexed column; this rewrites it with one UPDATE and rebuilds the summary,
+    whose low/out-of-stock counts depend on it.
+    
+    Returns:
+        int: number of products whose threshold changed
+    """
+    with transaction.atomic():
+        updated = Product.objects.filter(company=company, reorder_point__isnull=True).exclude(
+            low_stock_threshold=company.low_stock_threshold
+        ).update(low_stock_threshold=company.low_stock_threshold)
+        if updated:
+            rebuild_inventory_summary(company.pk)
+            bump_data_version(company.pk)
+    return updated
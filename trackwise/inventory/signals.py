@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import autocomplete
+from .models import Product
+from .search import get_search_backend
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, raw=False, **kwargs):
+    """Keep the search and autocomplete indexes in step with saves made through the ORM."""
+    if raw:
+        return
+    get_search_backend().index_products([instance.pk])
+    # The in-memory index is not transactional, so only patch it once the save is final
+    company_id, pk, item_name = instance.company_id, instance.pk, instance.item_name
+    transaction.on_commit(lambda: autocomplete.product_saved(company_id, pk, item_name))
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    get_search_backend().remove_products([instance.pk])
+    company_id, pk = instance.company_id, instance.pk
+    transaction.on_commit(lambda: autocomplete.product_deleted(company_id, pk))
@@ -1,3 +1,436 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+from unittest import skipUnless
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Model, QuerySet
+from django.test import TestCase, skipUnlessDBFeature
+from django.test.utils import ContextList
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+from accounts.models import Company, UserProfile
+from .importer import ImportFileError, import_products
+from .ledger import quantity_at, take_snapshots
+from .models import CompanyInventorySummary, Product, StockMovement, StockSnapshot
+from .pagination import keyset_page
+from .search import search_products
+from .services import (
+    adjust_stock, adjust_stock_batch, get_inventory_summary, low_stock_products, out_of_stock_products,
+    product_state, rebuild_inventory_summary, record_product_change,
+)
 
-# Create your tests here.
+
+def explain_uses_index(test, queryset, *index_names):
+    """Assert the database plans `queryset` through one of `index_names` rather than a table scan."""
+    if connection.vendor == 'postgresql':
+        # Test tables are tiny; make sure the planner shows whether the index is usable at all
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    plan = queryset.explain()
+    test.assertTrue(any(name in plan for name in index_names),
+                    f"Expected {' or '.join(index_names)} in plan:\n{plan}")
+
+
+def _context_instances(value, seen):
+    """Model instances in a template context value, with the related objects cached on them."""
+    if isinstance(value, Model):
+        if id(value) not in seen:
+            seen.add(id(value))
+            yield value
+            for related in value._state.fields_cache.values():
+                yield from _context_instances(related, seen)
+    elif isinstance(value, QuerySet):
+        # Only rows the template actually evaluated
+        yield from _context_instances(value._result_cache or [], seen)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _context_instances(item, seen)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _context_instances(item, seen)
+
+
+def assert_renders_selected_columns(test, response, max_bytes=200):
+    """
+    Assert every loaded column over `max_bytes` in the response's context appears in the page.
+
+    A large value that was read from the database but is missing from the HTML is a
+    column the view selected only to throw away; it should be left to defer()/only().
+    Only the first 40 characters are compared, so truncated and line-broken text still counts.
+    """
+    contexts = response.context if isinstance(response.context, ContextList) else [response.context]
+    content = response.content.decode()
+    seen = set()
+    for context in contexts:
+        for instance in _context_instances(list(context.flatten().values()), seen):
+            for field in instance._meta.concrete_fields:
+                value = instance.__dict__.get(field.attname)
+                if value is None or len(str(value).encode()) <= max_bytes:
+                    continue
+                test.assertTrue(escape(str(value))[:40] in content,
+                                f"{type(instance).__name__}.{field.name} ({len(str(value).encode())} bytes) "
+                                f"was selected but not rendered")
+
+
+class ProductIndexTests(TestCase):
+    """The inventory list, dashboard and stock queries are answered from their tenant-first indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Indexed Co')
+        other = Company.objects.create(name='Other Co')
+        Product.objects.bulk_create([
+            Product(company=company, item_name=f'Item {i}', quantity=i % 25, cost_price=i % 97)
+            for company in (cls.company, other)
+            for i in range(300)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        self.products = Product.objects.filter(company=self.company)
+
+    def test_name_order_uses_unique_index(self):
+        # SQLite keeps unique constraints added by a table rebuild as an unnamed autoindex
+        explain_uses_index(self, self.products.order_by('item_name', 'id')[:51],
+                           'product_company_item_name_uniq', 'sqlite_autoindex_inventory_product')
+
+    def test_cost_order_uses_cost_index(self):
+        explain_uses_index(self, self.products.order_by('cost_price', 'id')[:51], 'product_company_cost_idx')
+        explain_uses_index(self, self.products.order_by('-cost_price', '-id')[:51], 'product_company_cost_idx')
+
+    def test_recent_products_use_created_index(self):
+        explain_uses_index(self, self.products.order_by('-created_at')[:5], 'product_company_created_idx')
+
+    def test_recent_activity_uses_updated_index(self):
+        explain_uses_index(self, self.products.order_by('-updated_at')[:10], 'product_company_updated_idx')
+
+    def test_low_stock_uses_status_index(self):
+        explain_uses_index(self, low_stock_products(self.company), 'product_company_status_idx')
+
+    def test_out_of_stock_uses_status_index(self):
+        explain_uses_index(self, out_of_stock_products(self.company), 'product_company_status_idx')
+
+    def test_value_order_uses_value_index(self):
+        explain_uses_index(self, self.products.order_by('-total_value', '-id')[:51], 'product_company_value_idx')
+
+
+def assert_inline_scripts_parse(test, response):
+    """Assert every inline <script> of the response is valid JavaScript, using `node --check`."""
+    content = response.content.decode()
+    scripts = re.findall(r'<script(?![^>]*\bsrc=)[^>]*>(.*?)</script>', content, re.S)
+    test.assertTrue(scripts, 'No inline scripts in the page')
+    for script in scripts:
+        with tempfile.NamedTemporaryFile('w', suffix='.js') as source:
+            source.write(script)
+            source.flush()
+            result = subprocess.run(['node', '--check', source.name], capture_output=True, text=True)
+        test.assertEqual(result.returncode, 0, result.stderr)
+
+
+@skipUnless(shutil.which('node'), 'node is not installed')
+class InventoryListScriptTests(TestCase):
+    """The list pages' scripts parse and find the elements their handlers attach to."""
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Script Co')
+        Product.objects.bulk_create([
+            Product(company=self.company, item_name=f'Item {number:03}', quantity=5, cost_price=1)
+            for number in range(51)
+        ])
+
+    def _get_list(self, role):
+        user = User.objects.create_user(role, password='pw')
+        UserProfile.objects.create(user=user, company=self.company, role=role)
+        self.client.force_login(user)
+        response = self.client.get(reverse('inventory:inventory_list'))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _assert_wired(self, response):
+        assert_inline_scripts_parse(self, response)
+        # Stock buttons (delegated from the rows), infinite scroll and autocomplete
+        for marker in ('id="inventory-rows"', 'class="qty-button increase"', 'id="inventory-load-more-btn"',
+                       'id="product-suggestions"'):
+            self.assertContains(response, marker)
+
+    def test_owner_list(self):
+        self._assert_wired(self._get_list('business_owner'))
+
+    def test_staff_list(self):
+        self._assert_wired(self._get_list('staff'))
+
+
+class InventoryListColumnTests(TestCase):
+    """The inventory list selects only the columns its rows show."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name='Columns Co')
+        owner = User.objects.create_user('owner', password='pw')
+        UserProfile.objects.create(user=owner, company=company, role='business_owner', notes='Owner note. ' * 50)
+        Product.objects.create(company=company, item_name='Widget', quantity=3, cost_price=2)
+        # Not yet moved to ImageBlob; no content type, so only the annotated flag can tell it has an image
+        self.legacy = Product.objects.create(company=company, item_name='Old Widget', quantity=3, cost_price=2,
+                                             image='A' * 200000)
+        self.client.force_login(owner)
+
+    def test_list_skips_unrendered_columns(self):
+        response = self.client.get(reverse('inventory:inventory_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Owner note.')
+        self.assertContains(response, reverse('inventory:product_image', args=[self.legacy.pk]))
+        assert_renders_selected_columns(self, response)
+
+
+class RelevancePagingTests(TestCase):
+    """Paging search results by relevance visits every match once, even when ranks tie."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Paging Co')
+        # Same shape of name and category, so every match gets the same rank
+        for number in range(1, 8):
+            Product.objects.create(company=self.company, item_name=f'Widget {number}', category='Parts',
+                                   quantity=1, cost_price=1)
+        Product.objects.create(company=self.company, item_name='Widget widget', category='Parts',
+                               quantity=1, cost_price=1)
+
+    def test_tied_ranks_across_page_boundaries(self):
+        results = search_products(Product.objects.filter(company=self.company), 'widget')
+        expected = list(results.order_by('-search_rank', '-id').values_list('id', flat=True))
+        self.assertEqual(len(expected), 8)
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(results, 'relevance', cursor, page_size=3)
+            seen += [row.pk for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+
+class BatchAdjustStockTests(TestCase):
+    """The batched +/- endpoint clamps at zero and ignores products it cannot change."""
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Batch Co')
+        owner = User.objects.create_user('owner', password='pw')
+        UserProfile.objects.create(user=owner, company=self.company, role='business_owner')
+        self.client.force_login(owner)
+        self.bolt = Product.objects.create(company=self.company, item_name='Bolt', quantity=3, cost_price=1)
+        self.nut = Product.objects.create(company=self.company, item_name='Nut', quantity=10, cost_price=1)
+        other = Company.objects.create(name='Other Co')
+        self.foreign = Product.objects.create(company=other, item_name='Bolt', quantity=4, cost_price=1)
+
+    def _post(self, adjustments):
+        return self.client.post(reverse('inventory:batch_adjust_stock'), json.dumps(adjustments),
+                                content_type='application/json')
+
+    def test_batch(self):
+        response = self._post([
+            {'product_id': self.bolt.pk, 'delta': -2},
+            # Repeated ids are summed: -2 - 5 takes Bolt below zero, so it stops at zero
+            {'product_id': self.bolt.pk, 'delta': -5},
+            {'product_id': self.nut.pk, 'delta': 4},
+            {'product_id': self.foreign.pk, 'delta': -1},
+            {'product_id': 999999, 'delta': 1},
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['quantities'], {str(self.bolt.pk): 0, str(self.nut.pk): 14})
+        self.assertCountEqual(data['not_found'], [self.foreign.pk, 999999])
+        self.assertEqual(data['out_of_stock_count'], 1)
+
+        self.bolt.refresh_from_db()
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.bolt.quantity, 0)
+        self.assertEqual(self.foreign.quantity, 4)
+        # The ledger records the change actually made, not the one asked for
+        self.assertEqual(list(StockMovement.objects.filter(product_id=self.bolt.pk).values_list('delta', flat=True)),
+                         [-3])
+        self.assertFalse(StockMovement.objects.filter(product_id=self.foreign.pk).exists())
+
+    def test_malformed_batch_is_rejected(self):
+        response = self._post([{'product_id': self.bolt.pk}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+
+class ImportProductsTests(TestCase):
+    """CSV and XLSX imports upsert by item name, skip bad rows and carry state across chunks."""
+
+    ROWS = [
+        ['Item Name', 'Category', 'Qty', 'Unit', 'Cost'],
+        ['Bolt', '', 8, '', '2.50'],        # updates the existing product
+        ['Nut', '', 3, '', 1],
+        ['Washer', '', -1, '', 1],          # row 4: negative quantity
+        ['Screw', '', 'many', '', 1],       # row 5: not a number
+        ['', '', 1, '', 1],                 # row 6: no name
+        ['Rivet', 'Food & Beverages', 4, 'Boxes', 1],
+        ['Gear', '', 2, '', 1],
+        ['Nut', '', 6, '', 1],              # in the third chunk, updates the Nut created by the first
+    ]
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Import Co')
+        Product.objects.create(company=self.company, item_name='Bolt', quantity=5, cost_price=1)
+
+    def _csv(self):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(self.ROWS)
+        return io.BytesIO(buffer.getvalue().encode('utf-8'))
+
+    def _xlsx(self):
+        from openpyxl import Workbook
+        workbook = Workbook()
+        for row in self.ROWS:
+            workbook.active.append([None if value == '' else value for value in row])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def _assert_imported(self, result):
+        self.assertEqual((result['rows'], result['created'], result['updated'], result['error_count']), (5, 3, 2, 3))
+        self.assertEqual([row for row, _ in result['errors']], [4, 5, 6])
+
+        products = dict(Product.objects.filter(company=self.company).values_list('item_name', 'quantity'))
+        self.assertEqual(products, {'Bolt': 8, 'Nut': 6, 'Rivet': 4, 'Gear': 2})
+        # Display labels map to the stored choices
+        rivet = Product.objects.get(company=self.company, item_name='Rivet')
+        self.assertEqual((rivet.category, rivet.unit_of_measure), ('food', 'boxes'))
+        nut = Product.objects.get(company=self.company, item_name='Nut')
+        self.assertEqual(list(StockMovement.objects.filter(product_id=nut.pk).order_by('id')
+                              .values_list('delta', flat=True)), [3, 3])
+        summary = CompanyInventorySummary.objects.get(company=self.company)
+        self.assertEqual((summary.product_count, summary.total_quantity), (4, 20))
+
+    def test_csv(self):
+        self._assert_imported(import_products(self.company, self._csv(), 'stock.csv', chunk_size=2))
+
+    def test_xlsx(self):
+        self._assert_imported(import_products(self.company, self._xlsx(), 'stock.xlsx', chunk_size=2))
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as upload:
+            upload.write(self._csv().getvalue())
+            upload.flush()
+            out, err = io.StringIO(), io.StringIO()
+            call_command('import_products', upload.name, company=self.company.pk, chunk_size=2, stdout=out, stderr=err)
+        self.assertIn('5 rows imported, 3 created, 2 updated, 3 skipped', out.getvalue())
+        self.assertIn('row 4: quantity', err.getvalue())
+
+    def test_unreadable_files(self):
+        with self.assertRaises(ImportFileError):
+            import_products(self.company, io.BytesIO(b'item_name,quantity\nBolt,1\n'), 'stock.csv')
+        with self.assertRaises(ImportFileError):
+            import_products(self.company, io.BytesIO(b'not a zip'), 'stock.xlsx')
+
+
+class UpdatesTodayTests(TestCase):
+    """The running updates_today counter and a rebuild count the same feed entries."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Counter Co', time_zone='UTC')
+        self.products = []
+        for name in ('Bolt', 'Nut'):
+            with self.captureOnCommitCallbacks(execute=True):
+                product = Product.objects.create(company=self.company, item_name=name, quantity=20, cost_price=1)
+                record_product_change(self.company.pk, product.pk, None, product_state(product),
+                                      reason='created', item_name=name)
+            self.products.append(product)
+
+    def test_incremental_count_matches_rebuild(self):
+        bolt, nut = self.products
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_stock(self.company, bolt.pk, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_stock(self.company, bolt.pk, -1)
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_stock_batch(self.company, {bolt.pk: 2, nut.pk: -3})
+        # 2 added + 2 single adjustments + 2 batch lines in the feed
+        self.assertEqual(get_inventory_summary(self.company)['updates_today'], 6)
+        self.assertEqual(rebuild_inventory_summary(self.company.pk).updates_today, 6)
+
+        # The counter keeps going from the rebuilt value
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_stock(self.company, nut.pk, 1)
+        self.assertEqual(get_inventory_summary(self.company)['updates_today'], 7)
+        self.assertEqual(rebuild_inventory_summary(self.company.pk).updates_today, 7)
+
+
+class DeletedProductLedgerTests(TestCase):
+    """A deleted product's movements keep its id, so its history can still be read."""
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Ledger Co')
+        owner = User.objects.create_user('owner', password='pw')
+        UserProfile.objects.create(user=owner, company=self.company, role='business_owner')
+        self.client.force_login(owner)
+
+    def test_movements_survive_delete(self):
+        product = Product.objects.create(company=self.company, item_name='Crate', quantity=0, cost_price=5)
+        record_product_change(self.company.pk, product.pk, None, product_state(product), reason='created')
+        adjust_stock(self.company, product.pk, 4)
+
+        response = self.client.post(reverse('inventory:product_delete', args=[product.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Product.objects.filter(pk=product.pk).exists())
+
+        history = list(StockMovement.objects.filter(product_id=product.pk).order_by('created_at', 'id')
+                       .values_list('reason', 'delta'))
+        self.assertEqual(history, [('adjustment', 4), ('deleted', -4)])
+        # The ledger still nets out to the deleted product's final quantity of zero
+        self.assertEqual(sum(delta for _, delta in history), 0)
+
+    def _delete(self, product):
+        response = self.client.post(reverse('inventory:product_delete', args=[product.pk]))
+        self.assertEqual(response.status_code, 302)
+
+    def test_delete_creates_correct_first_summary(self):
+        # Written without record_product_change, so the company has no summary row yet
+        keep = Product.objects.create(company=self.company, item_name='Keep', quantity=2, cost_price=5)
+        gone = Product.objects.create(company=self.company, item_name='Gone', quantity=0, cost_price=5)
+        self.assertFalse(CompanyInventorySummary.objects.filter(company=self.company).exists())
+
+        self._delete(gone)
+        summary = CompanyInventorySummary.objects.get(company=self.company)
+        self.assertEqual((summary.product_count, summary.total_quantity, summary.out_of_stock_count), (1, 2, 0))
+        self.assertEqual(summary.total_value, keep.quantity * keep.cost_price)
+
+    def test_history_readable_after_delete(self):
+        product = Product.objects.create(company=self.company, item_name='Crate', quantity=0, cost_price=5)
+        record_product_change(self.company.pk, product.pk, None, product_state(product), reason='created')
+        adjust_stock(self.company, product.pk, 4)
+        snapshot_at = timezone.now()
+        self.assertEqual(take_snapshots(snapshot_at), 1)
+        adjust_stock(self.company, product.pk, 3)
+        before_delete = timezone.now()
+
+        self._delete(product)
+        self.assertTrue(StockSnapshot.objects.filter(product_id=product.pk).exists())
+        self.assertEqual(quantity_at(product.pk, snapshot_at), 4)
+        self.assertEqual(quantity_at(product.pk, before_delete), 7)
+        self.assertEqual(quantity_at(product.pk, timezone.now()), 0)
+
+    def test_history_without_snapshots_after_delete(self):
+        product = Product.objects.create(company=self.company, item_name='Crate', quantity=0, cost_price=5)
+        record_product_change(self.company.pk, product.pk, None, product_state(product), reason='created')
+        adjust_stock(self.company, product.pk, 2)
+        before_delete = timezone.now()
+
+        self._delete(product)
+        self.assertEqual(quantity_at(product.pk, before_delete), 2)
+        self.assertIsNone(quantity_at(999999, before_delete))
@@ -5,8 +5,13 @@ app_name = 'inventory'
 
 urlpatterns = [
     path('', views.inventory_list, name='inventory_list'),
+    path('page/', views.inventory_page, name='inventory_page'),
+    path('autocomplete/', views.product_autocomplete, name='product_autocomplete'),
+    path('stock/batch/', views.batch_adjust_stock, name='batch_adjust_stock'),
     path('add/', views.product_add, name='product_add'),
+    path('import/', views.product_import, name='product_import'),
     path('<int:pk>/', views.product_detail, name='product_detail'),
+    path('<int:pk>/image/', views.product_image, name='product_image'),
     path('<int:pk>/delete/', views.product_delete, name='product_delete'),
     path('<int:pk>/increase/', views.increase_stock, name='increase_stock'),
     path('<int:pk>/decrease/', views.decrease_stock, name='decrease_stock'),
@@ -1,49 +1,94 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from django.db.models import Q
-from .models import Product
+from django.http import JsonResponse, Http404
+from django.views.decorators.http import require_POST
+from django.db import transaction
+from .models import Product, HAS_LEGACY_IMAGE
+from . import autocomplete
 from .forms import ProductForm
+from .importer import import_products, ImportFileError, IMPORT_FIELDS
+from .pagination import keyset_page
+from .search import search_products
+from .services import (
+    inventory_stats, get_inventory_summary, record_product_change, product_state,
+    adjust_stock, adjust_stock_batch, STOCK_BATCH_LIMIT,
+)
 from accounts.models import UserProfile
+from accounts.data_version import company_data_condition
+from accounts.utils import image_response
 import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns the list rows render, plus total_value for the value sort's cursor. The thumbnail URL needs only
+# image_blob and the has_legacy_image flag, never the legacy base64 text.
+INVENTORY_LIST_FIELDS = (
+    'id', 'item_name', 'category', 'quantity', 'unit_of_measure', 'cost_price', 'low_stock_threshold',
+    'stock_status', 'total_value', 'image_blob',
+)
+
+def _filtered_products(request, profile):
+    """
+    Company products narrowed by the list's search box, plus the active search and sort options.
+    
+    Returns:
+        tuple: (products, search_query, cost_filter, sort key for keyset_page)
+    """
+    products = Product.objects.filter(company=profile.company).only(*INVENTORY_LIST_FIELDS).annotate(
+        has_legacy_image=HAS_LEGACY_IMAGE
+    )
+    
+    search_query = request.GET.get('search', '').strip()
+    if search_query:
+        products = search_products(products, search_query)
+    
+    cost_filter = request.GET.get('cost_filter', '')
+    # Searches are shown best match first unless a cost sort was picked
+    sort = cost_filter or ('relevance' if search_query else '')
+    return products, search_query, cost_filter, sort
+
+def _next_page_url(search_query, cost_filter, cursor):
+    if not cursor:
+        return None
+    params = {'after': cursor}
+    if search_query:
+        params['search'] = search_query
+    if cost_filter:
+        params['cost_filter'] = cost_filter
+    return f"{reverse('inventory:inventory_page')}?{urlencode(params)}"
 
 @login_required
+@company_data_condition
 def inventory_list(request):
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'User profile not found.')
         return redirect('dashboard:dashboard')
     
-    products = Product.objects.filter(company=profile.company)
-    
-    search_query = request.GET.get('search', '')
-    if search_query:
-        products = products.filter(
-            Q(item_name__icontains=search_query) |
-            Q(category__icontains=search_query)
-        )
-    
-    cost_filter = request.GET.get('cost_filter', '')
-    if cost_filter == 'low':
-        products = products.order_by('cost_price')
-    elif cost_filter == 'high':
-        products = products.order_by('-cost_price')
+    products, search_query, cost_filter, sort = _filtered_products(request, profile)
     
-    total_inventory_value = sum(product.total_value for product in products)
+    # Only the first page is rendered here; the rest is appended by inventory_page
+    page, next_cursor = keyset_page(products, sort)
     
-    low_stock_count = products.filter(quantity__lte=10, quantity__gt=0).count()
-    out_of_stock_count = products.filter(quantity=0).count()
+    # The maintained company summary covers the unfiltered list; searches aggregate their subset
+    stats = inventory_stats(products) if search_query else get_inventory_summary(profile.company)
     
     context = {
-        'products': products,
+        'products': page,
+        'total_products': stats['total_products'],
+        'next_page_url': _next_page_url(search_query, cost_filter, next_cursor),
         'search_query': search_query,
         'cost_filter': cost_filter,
         'profile': profile,
-        'total_inventory_value': total_inventory_value,
-        'low_stock_count': low_stock_count,
-        'out_of_stock_count': out_of_stock_count,
+        'total_inventory_value': stats['total_inventory_value'],
+        'low_stock_count': stats['low_stock_count'],
+        'out_of_stock_count': stats['out_of_stock_count'],
     }
     
     if profile.role == 'business_owner':
@@ -51,10 +96,52 @@ def inventory_list(request):
     else:
         return render(request, 'inventory/inventory_list_staff.html', context)
 
+@login_required
+@company_data_condition
+def inventory_page(request):
+    """HTML rows for the next page of the inventory list (infinite scroll)."""
+    try:
+        profile = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        raise Http404('User profile not found')
+    
+    products, search_query, cost_filter, sort = _filtered_products(request, profile)
+    page, next_cursor = keyset_page(products, sort, request.GET.get('after'))
+    
+    template = 'inventory/partials/product_rows.html'
+    if profile.role != 'business_owner':
+        template = 'inventory/partials/product_rows_staff.html'
+    
+    response = render(request, template, {'products': page, 'profile': profile})
+    # The client reads the next page's URL from this header; absent on the last page
+    next_url = _next_page_url(search_query, cost_filter, next_cursor)
+    if next_url:
+        response['X-Next-Page'] = next_url
+    return response
+
+@login_required
+def product_autocomplete(request):
+    """Product names starting with ?q=, served from the in-memory prefix index."""
+    try:
+        profile = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'User profile not found'}, status=403)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', autocomplete.AUTOCOMPLETE_LIMIT)), 1), 50)
+    except ValueError:
+        limit = autocomplete.AUTOCOMPLETE_LIMIT
+    
+    matches = autocomplete.complete(profile.company_id, request.GET.get('q', '').strip(), limit)
+    return JsonResponse({
+        'success': True,
+        'results': [{'id': pk, 'name': item_name} for pk, item_name in matches],
+    })
+
 @login_required
 def product_detail(request, pk):
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'User profile not found.')
         return redirect('dashboard:dashboard')
@@ -66,6 +153,8 @@ def product_detail(request, pk):
             messages.error(request, 'Access denied. Only business owners can edit products.')
             return redirect('inventory:inventory_list')
         
+        # Capture stock state before the form writes into the instance
+        before = product_state(product)
         form = ProductForm(request.POST, request.FILES, instance=product)
         if form.is_valid():
             # Get the product instance
@@ -76,8 +165,11 @@ def product_detail(request, pk):
             if uploaded_image:
                 updated_product.set_image_from_file(uploaded_image)
             
-            # Save the product
-            updated_product.save()
+            # Save the product and keep the company totals in step
+            with transaction.atomic():
+                updated_product.save()
+                record_product_change(updated_product.company_id, updated_product.pk, before, product_state(updated_product),
+                                      reason='edited', actor=profile, item_name=updated_product.item_name)
             
             messages.success(request, f'Product "{product.item_name}" updated successfully!')
             return redirect('inventory:inventory_list')
@@ -100,28 +192,49 @@ def product_detail(request, pk):
     else:
         return render(request, 'inventory/product_detail_staff.html', context)
 
+@login_required
+def product_image(request, pk):
+    """Serve a product image with ETag/304 support instead of inlining it as a data URI."""
+    try:
+        profile = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        raise Http404('User profile not found')
+    
+    product = get_object_or_404(
+        Product.objects.only('id', 'company_id', 'image_blob_id'),
+        pk=pk, company=profile.company
+    )
+    return image_response(
+        request,
+        product.image_blob_id,
+        lambda: Product.objects.filter(pk=pk).values_list('image', 'image_content_type').first(),
+    )
+
 @login_required
 def product_add(request):
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'User profile not found.')
         return redirect('dashboard:dashboard')
     
     if request.method == 'POST':
-        form = ProductForm(request.POST, request.FILES)
+        # Company is set up front so the form can check the name against this company's products
+        form = ProductForm(request.POST, request.FILES, instance=Product(company=profile.company))
         if form.is_valid():
             # Create product without committing to database
             product = form.save(commit=False)
-            product.company = profile.company
             
             # Handle image upload from the new field
             uploaded_image = request.FILES.get('image_upload')
             if uploaded_image:
                 product.set_image_from_file(uploaded_image)
             
-            # Save the product
-            product.save()
+            # Save the product and keep the company totals in step
+            with transaction.atomic():
+                product.save()
+                record_product_change(product.company_id, product.pk, None, product_state(product),
+                                      reason='created', actor=profile, item_name=product.item_name)
             
             messages.success(request, f'Product "{product.item_name}" added successfully!')
             return redirect('inventory:inventory_list')
@@ -139,66 +252,117 @@ def product_add(request):
     }
     return render(request, 'inventory/product_add.html', context)
 
-# The rest of the views remain unchanged...
 @login_required
-def increase_stock(request, pk):
+def product_import(request):
+    """Create or update many products at once from an uploaded CSV or XLSX file."""
+    try:
+        profile = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        messages.error(request, 'User profile not found.')
+        return redirect('dashboard:dashboard')
+    
+    if profile.role != 'business_owner':
+        messages.error(request, 'Access denied. Only business owners can import products.')
+        return redirect('inventory:inventory_list')
+    
+    result = None
     if request.method == 'POST':
-        try:
-            profile = request.user.userprofile
-            product = Product.objects.get(pk=pk, company=profile.company)
-            product.quantity += 1
-            product.save()
-            company_products = Product.objects.filter(company=profile.company)
-            total_products = company_products.count()
-            total_inventory_value = float(sum(p.total_value for p in company_products))
-            low_stock_count = company_products.filter(quantity__lte=10, quantity__gt=0).count()
-            out_of_stock_count = company_products.filter(quantity=0).count()
-
-            return JsonResponse({
-                'success': True,
-                'new_quantity': product.quantity,
-                'total_value': float(product.total_value),
-                'total_products': total_products,
-                'total_inventory_value': total_inventory_value,
-                'low_stock_count': low_stock_count,
-                'out_of_stock_count': out_of_stock_count,
-            })
-        except (Product.DoesNotExist, UserProfile.DoesNotExist):
-            return JsonResponse({'success': False, 'error': 'Product not found'})
-    return JsonResponse({'success': False, 'error': 'Invalid request'})
+        upload = request.FILES.get('import_file')
+        if not upload:
+            messages.error(request, 'Choose a CSV or Excel file to import.')
+        else:
+            try:
+                result = import_products(profile.company, upload, upload.name, actor=profile)
+            except ImportFileError as e:
+                messages.error(request, str(e))
+            else:
+                logger.info(f"Imported {result['rows']} rows for company {profile.company_id} "
+                            f"in {result['seconds']:.1f}s ({result['rows_per_second']:.0f} rows/s)")
+                messages.success(
+                    request,
+                    f"Imported {result['created']} new and {result['updated']} updated products "
+                    f"({result['error_count']} rows skipped)."
+                )
+    
+    context = {
+        'profile': profile,
+        'result': result,
+        'columns': IMPORT_FIELDS,
+    }
+    return render(request, 'inventory/product_import.html', context)
+
+def _adjust_stock_response(request, pk, delta):
+    """Apply a +/- click atomically and return the new quantity with the company totals."""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request'})
+    try:
+        profile = request.tenant.profile
+        result = adjust_stock(profile.company, pk, delta, actor=profile)
+    except (Product.DoesNotExist, UserProfile.DoesNotExist):
+        return JsonResponse({'success': False, 'error': 'Product not found'})
+    
+    stats = get_inventory_summary(profile.company)
+    return JsonResponse({
+        'success': True,
+        'new_quantity': result['quantity'],
+        'total_value': float(result['quantity'] * result['cost_price']),
+        'total_products': stats['total_products'],
+        'total_inventory_value': float(stats['total_inventory_value']),
+        'low_stock_count': stats['low_stock_count'],
+        'out_of_stock_count': stats['out_of_stock_count'],
+    })
+
+@login_required
+def increase_stock(request, pk):
+    return _adjust_stock_response(request, pk, 1)
 
 @login_required
 def decrease_stock(request, pk):
-    if request.method == 'POST':
-        try:
-            profile = request.user.userprofile
-            product = Product.objects.get(pk=pk, company=profile.company)
-            if product.quantity > 0:
-                product.quantity -= 1
-                product.save()
-            company_products = Product.objects.filter(company=profile.company)
-            total_products = company_products.count()
-            total_inventory_value = float(sum(p.total_value for p in company_products))
-            low_stock_count = company_products.filter(quantity__lte=10, quantity__gt=0).count()
-            out_of_stock_count = company_products.filter(quantity=0).count()
-
-            return JsonResponse({
-                'success': True,
-                'new_quantity': product.quantity,
-                'total_value': float(product.total_value),
-                'total_products': total_products,
-                'total_inventory_value': total_inventory_value,
-                'low_stock_count': low_stock_count,
-                'out_of_stock_count': out_of_stock_count,
-            })
-        except (Product.DoesNotExist, UserProfile.DoesNotExist):
-            return JsonResponse({'success': False, 'error': 'Product not found'})
-    return JsonResponse({'success': False, 'error': 'Invalid request'})
+    # At zero the UPDATE matches nothing and the unchanged quantity is returned
+    return _adjust_stock_response(request, pk, -1)
+
+@login_required
+@require_POST
+def batch_adjust_stock(request):
+    """
+    Apply many +/- changes at once.
+    
+    Expects a JSON list of {"product_id": int, "delta": int}. Repeated product ids are summed.
+    Returns the new quantity of each product plus the company totals.
+    """
+    try:
+        profile = request.tenant.profile
+    except UserProfile.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'User profile not found'}, status=403)
+    
+    try:
+        adjustments = json.loads(request.body)
+        deltas = {}
+        for item in adjustments:
+            product_id, delta = int(item['product_id']), int(item['delta'])
+            deltas[product_id] = deltas.get(product_id, 0) + delta
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+    
+    if len(deltas) > STOCK_BATCH_LIMIT:
+        return JsonResponse({'success': False, 'error': f'At most {STOCK_BATCH_LIMIT} products per batch'}, status=400)
+    
+    quantities = adjust_stock_batch(profile.company, deltas, actor=profile)
+    stats = get_inventory_summary(profile.company)
+    return JsonResponse({
+        'success': True,
+        'quantities': {str(pk): quantity for pk, quantity in quantities.items()},
+        'not_found': [pk for pk in deltas if pk not in quantities],
+        'total_products': stats['total_products'],
+        'total_inventory_value': float(stats['total_inventory_value']),
+        'low_stock_count': stats['low_stock_count'],
+        'out_of_stock_count': stats['out_of_stock_count'],
+    })
 
 @login_required
 def product_delete(request, pk):
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
         product = Product.objects.get(pk=pk, company=profile.company)
         
         if profile.role != 'business_owner':
@@ -207,7 +371,13 @@ def product_delete(request, pk):
         
         if request.method == 'POST':
             product_name = product.item_name
-            product.delete()
+            product_id, before = product.pk, product_state(product)
+            with transaction.atomic():
+                # Delete first: a summary rebuilt while recording must no longer count this product
+                product.delete()
+                # The ledger keeps this product's id after the delete, so its history stays readable
+                record_product_change(profile.company_id, product_id, before, None,
+                                      reason='deleted', actor=profile, item_name=product_name)
             messages.success(request, f'Product "{product_name}" deleted successfully!')
             return redirect('inventory:inventory_list')
     except (Product.DoesNotExist, UserProfile.DoesNotExist):
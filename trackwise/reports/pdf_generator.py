@@ -116,15 +116,9 @@ def create_inventory_pdf(inventory_data, company_name):
         ]
         
         for idx, item in enumerate(inventory_data['items'], 1):
-            # Determine status
+            # Status comes from the report data (Product.stock_status), not a threshold of its own
             quantity = item.get('current_stock', 0)
-            
-            if quantity == 0:
-                status = "OUT OF STOCK"
-            elif quantity <= 5:
-                status = "LOW STOCK"
-            else:
-                status = "IN STOCK"
+            status = item.get('status', '').upper()
             
             items_data.append([
                 str(idx),
@@ -33,7 +33,7 @@ def staff_activity_report(request):
         
         # Get the current user's profile and company
         try:
-            current_user_profile = UserProfile.objects.get(user=request.user)
+            current_user_profile = request.tenant.profile
             user_company = current_user_profile.company
             print(f"Current user company: {user_company.name}")
         except UserProfile.DoesNotExist:
@@ -147,12 +147,12 @@ def inventory_report(request):
     """Inventory Report with Export Functionality - SECURED BY COMPANY"""
     try:
         from inventory.models import Product
+        from inventory.services import get_inventory_summary
         from accounts.models import UserProfile
-        from django.db.models import Sum, Count
         
         # Get the current user's company
         try:
-            current_user_profile = UserProfile.objects.get(user=request.user)
+            current_user_profile = request.tenant.profile
             user_company = current_user_profile.company
         except UserProfile.DoesNotExist:
             messages.error(request, 'Your user profile is not properly configured.')
@@ -164,50 +164,38 @@ def inventory_report(request):
         # ONLY fetch products from the current user's company
         products = Product.objects.filter(company=user_company).order_by('item_name')
         
-        # Calculate statistics
-        total_products = products.count()
-        total_quantity = products.aggregate(total=Sum('quantity'))['total'] or 0
-        
-        # Calculate total value safely
-        total_value = 0
-        for product in products:
-            if hasattr(product, 'total_value') and product.total_value:
-                total_value += float(product.total_value)
+        # Read statistics from the maintained company summary
+        stats = get_inventory_summary(user_company)
+        total_products = stats['total_products']
+        total_quantity = stats['total_quantity']
+        total_value = float(stats['total_inventory_value'])
         
         # Stock status counts
-        low_stock_threshold = 10
-        low_stock_items = products.filter(quantity__lte=low_stock_threshold, quantity__gt=0).count()
-        out_of_stock_items = products.filter(quantity=0).count()
+        low_stock_items = stats['low_stock_count']
+        out_of_stock_items = stats['out_of_stock_count']
         
-        # Prepare individual items data
-        items_list = []
-        for product in products:
-            # Determine stock status
-            if product.quantity == 0:
-                status = 'Out of Stock'
-            elif product.quantity <= low_stock_threshold:
-                status = 'Low Stock'
-            else:
-                status = 'In Stock'
-            
-            # Calculate item value safely
-            item_value = 0
-            if hasattr(product, 'total_value') and product.total_value:
-                item_value = float(product.total_value)
-            else:
-                item_value = float(product.quantity * product.cost_price)
-            
-            items_list.append({
-                'id': product.id,
-                'name': product.item_name,
-                'category': product.get_category_display(),
-                'current_stock': product.quantity,
+        # Status and value are stored columns, so each row only needs its labels looked up
+        status_labels = dict(Product.STOCK_STATUS_CHOICES)
+        category_labels = dict(Product.CATEGORY_CHOICES)
+        unit_labels = dict(Product.UNIT_CHOICES)
+        items_list = [
+            {
+                'id': pk,
+                'name': item_name,
+                'category': category_labels.get(category, category),
+                'current_stock': quantity,
                 'min_stock': low_stock_threshold,
-                'status': status,
-                'price': float(product.cost_price),
-                'unit': product.get_unit_of_measure_display(),
-                'total_value': round(item_value, 2)
-            })
+                'status': status_labels[stock_status],
+                'price': float(cost_price),
+                'unit': unit_labels.get(unit, unit),
+                'total_value': float(item_value),
+            }
+            for pk, item_name, category, quantity, low_stock_threshold, stock_status, cost_price, unit, item_value
+            in products.values_list(
+                'id', 'item_name', 'category', 'quantity', 'low_stock_threshold', 'stock_status', 'cost_price',
+                'unit_of_measure', 'total_value'
+            )
+        ]
         
         inventory_data = {
             'total_items': total_products,
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:55
+
+from django.db import migrations, models
+from accounts.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0012_tenant_indexes'),
+        ('staff_issues', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='issuecomment',
+            index=models.Index(fields=['issue', 'created_at'], name='issuecomment_issue_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='issuereport',
+            index=models.Index(fields=['company', '-created_at'], name='issue_company_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='issuereport',
+            index=models.Index(fields=['company', 'status', '-created_at'], name='issue_company_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='issuereport',
+            index=models.Index(fields=['reporter', '-created_at'], name='issue_reporter_created_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from accounts.managers import HeavyFieldsManager
 from accounts.models import UserProfile, Company
 
 class IssueReport(models.Model):
@@ -45,8 +46,17 @@ class IssueReport(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(blank=True, null=True)
     
+    # Lists show an excerpt (see staff_issues.views.ISSUE_LIST_FIELDS); see accounts.managers
+    HEAVY_FIELDS = ('description',)
+    objects = HeavyFieldsManager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', '-created_at'], name='issue_company_created_idx'),
+            models.Index(fields=['company', 'status', '-created_at'], name='issue_company_status_idx'),
+            models.Index(fields=['reporter', '-created_at'], name='issue_reporter_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
@@ -60,6 +70,9 @@ class IssueComment(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['issue', 'created_at'], name='issuecomment_issue_created_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.author.user.username} on {self.issue.title}"
\ No newline at end of file
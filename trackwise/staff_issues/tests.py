@@ -1,3 +1,70 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from accounts.models import Company, UserProfile
+from inventory.tests import assert_renders_selected_columns, explain_uses_index
+from .models import IssueComment, IssueReport
 
-# Create your tests here.
+
+class IssueIndexTests(TestCase):
+    """Issue lists filter on company (and status or reporter) and order by newest first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Indexed Co')
+        other = Company.objects.create(name='Other Co')
+        reporters = [
+            UserProfile.objects.create(user=User.objects.create(username=f'reporter{i}'), company=cls.company)
+            for i in range(20)
+        ]
+        cls.reporter = reporters[0]
+        statuses = [status for status, _ in IssueReport.STATUS_CHOICES]
+        issues = IssueReport.objects.bulk_create([
+            IssueReport(title=f'Issue {i}', description='-', issue_type='other', reporter=reporters[i % len(reporters)],
+                        company=company, status=statuses[i % len(statuses)])
+            for company in (cls.company, other)
+            for i in range(200)
+        ])
+        IssueComment.objects.bulk_create([
+            IssueComment(issue=issue, author=cls.reporter, comment='-') for issue in issues for _ in range(2)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_issue_list_uses_company_created_index(self):
+        explain_uses_index(self, IssueReport.objects.filter(company=self.company).order_by('-created_at'),
+                           'issue_company_created_idx')
+
+    def test_status_filter_uses_company_status_index(self):
+        explain_uses_index(self, IssueReport.objects.filter(company=self.company, status='pending').order_by('-created_at'),
+                           'issue_company_status_idx')
+
+    def test_my_issues_use_reporter_index(self):
+        explain_uses_index(self, IssueReport.objects.filter(reporter=self.reporter, company=self.company).order_by('-created_at'),
+                           'issue_reporter_created_idx')
+
+    def test_comments_use_issue_created_index(self):
+        issue = IssueReport.objects.filter(company=self.company).first()
+        explain_uses_index(self, IssueComment.objects.filter(issue=issue).order_by('created_at'),
+                           'issuecomment_issue_created_idx')
+
+
+class IssueListColumnTests(TestCase):
+    """The issue list reads a description excerpt instead of the full text."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name='Columns Co')
+        owner = User.objects.create_user('owner', password='pw')
+        profile = UserProfile.objects.create(user=owner, company=company, role='business_owner')
+        IssueReport.objects.create(title='Shelf count off', description='Counted wrong. ' * 40 + 'Tail sentence.',
+                                   issue_type='other', reporter=profile, company=company)
+        self.client.force_login(owner)
+
+    def test_list_skips_unrendered_columns(self):
+        response = self.client.get(reverse('staff_issues:issue_list'))
+        self.assertContains(response, 'Counted wrong.')
+        self.assertNotContains(response, 'Tail sentence.')
+        assert_renders_selected_columns(self, response)
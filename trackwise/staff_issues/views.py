@@ -2,16 +2,32 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
+from django.db.models.functions import Substr
 from django.utils import timezone
 from accounts.models import UserProfile
+from accounts.data_version import company_data_condition
 from .models import IssueReport, IssueComment
+from dashboard.activity import record_activity
 from .forms import IssueReportForm, IssueCommentForm
 
+# Columns the issue list renders; the description is shown as a 50-word excerpt
+ISSUE_LIST_FIELDS = (
+    'id', 'title', 'issue_type', 'priority', 'status', 'created_at',
+    'reporter__user__first_name', 'reporter__user__last_name',
+)
+ISSUE_EXCERPT_LENGTH = 600
+
+def _issue_list_rows(issues):
+    """`issues` narrowed to the list's columns, with `description_excerpt` instead of the full text, newest first."""
+    return issues.select_related('reporter', 'reporter__user').only(*ISSUE_LIST_FIELDS).annotate(
+        description_excerpt=Substr('description', 1, ISSUE_EXCERPT_LENGTH)
+    ).order_by('-created_at')
+
 @login_required
 def report_issue(request):
     """Staff can submit new issue reports"""
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'User profile not found.')
         return redirect('dashboard:dashboard')
@@ -23,6 +39,7 @@ def report_issue(request):
             issue.reporter = profile
             issue.company = profile.company
             issue.save()
+            record_activity(issue.company_id, 'issue_reported', issue.title, issue.get_issue_type_display(), profile)
             
             messages.success(request, 'Issue reported successfully! We will look into it soon.')
             return redirect('staff_issues:issue_list')
@@ -38,18 +55,17 @@ def report_issue(request):
     return render(request, 'staff_issues/report_issue.html', context)
 
 @login_required
+@company_data_condition
 def issue_list(request):
     """View all issues for the current user's company"""
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'User profile not found.')
         return redirect('dashboard:dashboard')
     
     # Staff can only see issues from their company
-    issues = IssueReport.objects.filter(company=profile.company).select_related(
-        'reporter', 'reporter__user'
-    ).prefetch_related('comments').order_by('-created_at')
+    issues = _issue_list_rows(IssueReport.objects.filter(company=profile.company))
     
     # Filter by status if provided
     status_filter = request.GET.get('status')
@@ -92,14 +108,14 @@ def issue_list(request):
 def issue_detail(request, issue_id):
     """View issue details and add comments"""
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'User profile not found.')
         return redirect('dashboard:dashboard')
     
     # Staff can only see issues from their company
     issue = get_object_or_404(
-        IssueReport.objects.select_related('reporter', 'reporter__user', 'company'),
+        IssueReport.objects.with_heavy_fields().select_related('reporter', 'reporter__user', 'company'),
         id=issue_id,
         company=profile.company
     )
@@ -114,6 +130,7 @@ def issue_detail(request, issue_id):
             comment.issue = issue
             comment.author = profile
             comment.save()
+            record_activity(issue.company_id, 'issue_comment', issue.title, actor=profile)
             
             messages.success(request, 'Comment added successfully!')
             return redirect('staff_issues:issue_detail', issue_id=issue.id)
@@ -137,7 +154,7 @@ def update_issue_status(request, issue_id):
     """Business owners can update issue status"""
     if request.method == 'POST':
         try:
-            profile = request.user.userprofile
+            profile = request.tenant.profile
         except UserProfile.DoesNotExist:
             messages.error(request, 'User profile not found.')
             return redirect('dashboard:dashboard')
@@ -158,6 +175,7 @@ def update_issue_status(request, issue_id):
             if new_status in ['resolved', 'closed']:
                 issue.resolved_at = timezone.now()
             issue.save()
+            record_activity(issue.company_id, 'issue_status', issue.title, issue.get_status_display(), profile)
             messages.success(request, f'Issue status updated to {issue.get_status_display()}')
         else:
             messages.error(request, 'Invalid status selected.')
@@ -165,18 +183,19 @@ def update_issue_status(request, issue_id):
     return redirect('staff_issues:issue_detail', issue_id=issue_id)
 
 @login_required
+@company_data_condition
 def my_reported_issues(request):
     """View issues reported by the current user"""
     try:
-        profile = request.user.userprofile
+        profile = request.tenant.profile
     except UserProfile.DoesNotExist:
         messages.error(request, 'User profile not found.')
         return redirect('dashboard:dashboard')
     
-    issues = IssueReport.objects.filter(
+    issues = _issue_list_rows(IssueReport.objects.filter(
         reporter=profile,
         company=profile.company
-    ).select_related('reporter', 'reporter__user').order_by('-created_at')
+    ))
     
     context = {
         'issues': issues,
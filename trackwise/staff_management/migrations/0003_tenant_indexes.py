@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:55
+
+from django.db import migrations, models
+from accounts.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0012_tenant_indexes'),
+        ('staff_management', '0002_alter_staffprofile_permissions'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='staffprofile',
+            index=models.Index(fields=['status', 'hire_date'], name='staffprofile_status_hire_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from accounts.managers import HeavyFieldsManager
 from accounts.models import UserProfile, Company
 
 class StaffProfile(models.Model):
@@ -23,10 +24,18 @@ class StaffProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Only the detail and edit pages show these; see accounts.managers
+    HEAVY_FIELDS = ('assigned_locations', 'permissions', 'notes')
+    objects = HeavyFieldsManager()
+    
     def __str__(self):
         return f"{self.user_profile.user.get_full_name()} - {self.position}"
     
     class Meta:
         db_table = 'staff_management_staffprofile'
         verbose_name = 'Staff Profile'
-        verbose_name_plural = 'Staff Profiles'
\ No newline at end of file
+        verbose_name_plural = 'Staff Profiles'
+        # Staff are reached through user_profile (company is on UserProfile); reports filter on these
+        indexes = [
+            models.Index(fields=['status', 'hire_date'], name='staffprofile_status_hire_idx'),
+        ]
\ No newline at end of file
@@ -1,3 +1,59 @@
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from accounts.models import Company, UserProfile
+from inventory.tests import assert_renders_selected_columns, explain_uses_index
+from .models import StaffProfile
 
-# Create your tests here.
+
+class StaffProfileIndexTests(TestCase):
+    """The staff activity report counts staff by status and hire date."""
+
+    @classmethod
+    def setUpTestData(cls):
+        company = Company.objects.create(name='Indexed Co')
+        statuses = [status for status, _ in StaffProfile.STATUS_CHOICES]
+        for i in range(150):
+            profile = UserProfile.objects.create(user=User.objects.create(username=f'staff{i}'), company=company)
+            StaffProfile.objects.create(
+                user_profile=profile, employee_id=f'E{i}', position='Clerk', department='Stock',
+                hire_date=date(2020, 1, 1) + timedelta(days=i * 7), status=statuses[i % len(statuses)],
+                assigned_locations='Main',
+            )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_status_count_uses_status_hire_index(self):
+        explain_uses_index(self, StaffProfile.objects.filter(hire_date__lte=date(2021, 1, 1), status='active'),
+                           'staffprofile_status_hire_idx')
+
+
+class StaffListColumnTests(TestCase):
+    """The staff list leaves notes, permissions and locations in the database."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name='Columns Co')
+        owner = User.objects.create_user('owner', password='pw')
+        UserProfile.objects.create(user=owner, company=company, role='business_owner')
+        staff = UserProfile.objects.create(user=User.objects.create(username='clerk', first_name='Ana'), company=company)
+        StaffProfile.objects.create(
+            user_profile=staff, employee_id='E1', position='Clerk', department='Stock', hire_date=date(2024, 1, 1),
+            assigned_locations='Warehouse A, ' * 30, permissions={'can_adjust_stock': True, 'note': 'x' * 300},
+            notes='Private staff note. ' * 30,
+        )
+        self.client.force_login(owner)
+
+    def test_list_skips_unrendered_columns(self):
+        response = self.client.get(reverse('staff_management:staff_list'))
+        self.assertContains(response, 'Ana')
+        self.assertNotContains(response, 'Private staff note.')
+        assert_renders_selected_columns(self, response)
+
+    def test_detail_loads_full_row(self):
+        staff = StaffProfile.objects.get()
+        response = self.client.get(reverse('staff_management:staff_detail', args=[staff.pk]))
+        self.assertContains(response, 'Private staff note.')
@@ -6,16 +6,24 @@ from django.http import JsonResponse
 from django.contrib.auth.models import User
 from accounts.models import UserProfile, Company
 from .models import StaffProfile
+from dashboard.activity import record_activity
 from .forms import StaffUserCreationForm, StaffProfileForm, StaffSearchForm, StaffUpdateForm
 from django.utils import timezone
 from datetime import timedelta
 
+# Columns the staff list renders; notes, permissions and locations stay in the database
+STAFF_LIST_FIELDS = (
+    'id', 'employee_id', 'position', 'department', 'hire_date', 'status',
+    'user_profile__assigned_location',
+    'user_profile__user__first_name', 'user_profile__user__last_name', 'user_profile__user__email',
+)
+
 @login_required
 def staff_list(request):
     """Display staff from the current user's company only"""
     # Get the current user's profile and company
     try:
-        current_user_profile = UserProfile.objects.get(user=request.user)
+        current_user_profile = request.tenant.profile
         user_company = current_user_profile.company
     except UserProfile.DoesNotExist:
         messages.error(request, 'Your user profile is not properly configured. Please contact administrator.')
@@ -24,9 +32,8 @@ def staff_list(request):
     # Filter staff profiles by the current user's company
     staff_profiles = StaffProfile.objects.select_related(
         'user_profile', 
-        'user_profile__user',
-        'user_profile__company'
-    ).filter(
+        'user_profile__user'
+    ).only(*STAFF_LIST_FIELDS).filter(
         user_profile__company=user_company
     ).order_by('user_profile__user__first_name')
     
@@ -68,7 +75,7 @@ def staff_detail(request, staff_id):
     """Display detailed information about a specific staff member from the same company"""
     # Get the current user's company
     try:
-        current_user_profile = UserProfile.objects.get(user=request.user)
+        current_user_profile = request.tenant.profile
         user_company = current_user_profile.company
     except UserProfile.DoesNotExist:
         messages.error(request, 'Your user profile is not properly configured. Please contact administrator.')
@@ -76,7 +83,7 @@ def staff_detail(request, staff_id):
     
     # Only allow viewing staff from the same company
     staff_profile = get_object_or_404(
-        StaffProfile.objects.select_related(
+        StaffProfile.objects.with_heavy_fields().select_related(
             'user_profile', 
             'user_profile__user',
             'user_profile__company'
@@ -97,7 +104,7 @@ def staff_create(request):
     """Create a new staff account in the current user's company"""
     # Get the current user's company
     try:
-        current_user_profile = UserProfile.objects.get(user=request.user)
+        current_user_profile = request.tenant.profile
         company = current_user_profile.company
     except UserProfile.DoesNotExist:
         messages.error(request, 'Your user profile is not properly configured. Please contact administrator.')
@@ -128,6 +135,8 @@ def staff_create(request):
             staff_profile = profile_form.save(commit=False)
             staff_profile.user_profile = user_profile
             staff_profile.save()
+            record_activity(company.pk, 'staff_added', user.get_full_name() or user.username,
+                            staff_profile.position, current_user_profile)
             
             messages.success(request, f'Staff member {user.get_full_name()} created successfully!')
             return redirect('staff_management:staff_list')
@@ -149,7 +158,7 @@ def staff_update(request, staff_id):
     """Update staff information - only for staff in the same company"""
     # Get the current user's company
     try:
-        current_user_profile = UserProfile.objects.get(user=request.user)
+        current_user_profile = request.tenant.profile
         user_company = current_user_profile.company
     except UserProfile.DoesNotExist:
         messages.error(request, 'Your user profile is not properly configured. Please contact administrator.')
@@ -157,7 +166,7 @@ def staff_update(request, staff_id):
     
     # Only allow updating staff from the same company
     staff_profile = get_object_or_404(
-        StaffProfile.objects.select_related(
+        StaffProfile.objects.with_heavy_fields().select_related(
             'user_profile', 
             'user_profile__user'
         ).filter(
@@ -186,6 +195,8 @@ def staff_update(request, staff_id):
             user_profile.department = profile_form.cleaned_data.get('department', 'General')
             user_profile.position = profile_form.cleaned_data.get('position', '')
             user_profile.save()
+            record_activity(user_company.pk, 'staff_updated', user.get_full_name() or user.username,
+                            'Details updated', current_user_profile)
             
             messages.success(request, f'Staff member {user.get_full_name()} updated successfully!')
             # CHANGED: Redirect to staff_list instead of staff_detail
@@ -212,7 +223,7 @@ def staff_toggle_status(request, staff_id):
     if request.method == 'POST':
         # Get the current user's company
         try:
-            current_user_profile = UserProfile.objects.get(user=request.user)
+            current_user_profile = request.tenant.profile
             user_company = current_user_profile.company
         except UserProfile.DoesNotExist:
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -239,6 +250,9 @@ def staff_toggle_status(request, staff_id):
             action = 'activated'
         
         staff_profile.save()
+        staff_user = staff_profile.user_profile.user
+        record_activity(user_company.pk, 'staff_updated', staff_user.get_full_name() or staff_user.username,
+                        action.capitalize(), current_user_profile)
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
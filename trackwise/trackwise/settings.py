@@ -52,8 +52,9 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'accounts.middleware.UserStatusMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # After MessageMiddleware: it leaves a message when signing out revoked staff
+    'accounts.middleware.TenantMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -160,15 +161,72 @@ else:
     print("   EMAIL_HOST_USER=cararagtrisharaye@gmail.com")
     print("   EMAIL_HOST_PASSWORD=your-16-digit-app-password")
 
+# Emails are queued in EmailOutbox and sent by `manage.py process_outbox` (see accounts/outbox.py).
+# Failed emails are retried after EMAIL_OUTBOX_RETRY_DELAY seconds, doubling up to the max delay.
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '8'))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', '60'))
+EMAIL_OUTBOX_RETRY_MAX_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_MAX_DELAY', '3600'))
+
 # Note: No MEDIA settings needed since images are stored as BLOB in database
 print("✅ USING DATABASE BLOB STORAGE FOR IMAGES")
 
+# Resized WebP/JPEG variants are generated off the request thread (see accounts/images.py)
+IMAGE_VARIANTS_ASYNC = os.getenv('IMAGE_VARIANTS_ASYNC', 'True').lower() == 'true'
+IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', '2'))
+IMAGE_VARIANT_QUEUE_SIZE = int(os.getenv('IMAGE_VARIANT_QUEUE_SIZE', '16'))
+
+# Per-process product name index behind inventory autocomplete (see inventory/autocomplete.py)
+AUTOCOMPLETE_MAX_NAMES = int(os.getenv('AUTOCOMPLETE_MAX_NAMES', '200000'))
+AUTOCOMPLETE_TTL = int(os.getenv('AUTOCOMPLETE_TTL', '300'))
+
+# Cache shared by the dashboard cache and the conditional-GET data versions.
+# Locmem is per process, so production defaults to the database cache (created by
+# `manage.py createcachetable`), which every worker sees.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem' if DEBUG else 'db')
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'trackwise'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, 'cache')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'trackwise_cache'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': 300,
+    }
+}
+
+# Dashboard statistics are cached per company and data version (see dashboard/services.py)
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '300'))
+
+# Seconds a user's cached access status lives; profile saves invalidate it sooner (see accounts/access.py)
+ACCESS_STATUS_TTL = int(os.getenv('ACCESS_STATUS_TTL', '600'))
+
+# Days of dashboard activity kept by the prune_activity command
+ACTIVITY_RETENTION_DAYS = int(os.getenv('ACTIVITY_RETENTION_DAYS', '90'))
+
 # Custom user model
 AUTH_USER_MODEL = 'auth.User'
 
+# The tenant backend loads user, profile, company and staff record in one query
+# (see accounts/tenant.py). ModelBackend stays listed so sessions created before
+# the switch remain valid until they expire.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.TenantModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Session settings
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds
-SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are read through the cache and only rewritten when their data changes
+# or SESSION_REFRESH_FRACTION of their lifetime has passed since the last save
+# (see accounts/session_store.py), instead of on every request.
+SESSION_ENGINE = 'accounts.session_store'
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_FRACTION = float(os.getenv('SESSION_REFRESH_FRACTION', '0.1'))
+# Rows per DELETE when clear_expired_sessions removes expired sessions
+SESSION_CLEANUP_BATCH_SIZE = int(os.getenv('SESSION_CLEANUP_BATCH_SIZE', '5000'))
 
 # Security settings for production
 if not DEBUG: